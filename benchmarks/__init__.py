@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the engine's hot paths. Run them with ``python -m benchmarks``.
+"""
@@ -0,0 +1,172 @@
+"""
+Runs every benchmark, prints a summary table and writes the results as JSON.
+
+    python -m benchmarks [--output FILE] [--filter TEXT] [--min-time SECONDS]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from itertools import chain
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player
+from chessington.engine.perft import play_moves
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.search import Searcher
+
+from benchmarks.harness import measure, skipped
+
+# A fixed corpus of positions, each reached by playing these moves from the starting position
+CORPUS = {
+    'start': [],
+    'open_game': ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'f8c5'],
+    'queens_gambit': ['d2d4', 'd7d5', 'c2c4', 'e7e6', 'b1c3', 'g8f6', 'c1g5', 'f8e7'],
+    'sicilian': ['e2e4', 'c7c5', 'g1f3', 'd7d6', 'd2d4', 'c5d4', 'f3d4', 'g8f6', 'b1c3', 'a7a6'],
+    'middlegame': ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5', 'a7a6', 'b5c6', 'd7c6', 'd2d3', 'f8d6',
+                   'b1d2', 'g8e7', 'd2c4', 'e7g6', 'c4d6', 'c7d6', 'c1e3', 'd8c7'],
+    'check': ['e2e4', 'f7f6', 'd2d4', 'g7g5', 'd1h5'],
+}
+
+
+def _corpus_boards():
+    return {name: play_moves(Board.at_starting_position(), moves) for name, moves in CORPUS.items()}
+
+
+def _pieces_of_type(board, piece_type):
+    return [piece for row in board.board for piece in row if isinstance(piece, piece_type)]
+
+
+def _engine_benchmarks():
+    boards = _corpus_boards()
+    middlegame = boards['middlegame']
+    pieces = [piece for row in middlegame.board for piece in row if piece is not None]
+    king = middlegame.get_king(middlegame.current_player)
+    knight = _pieces_of_type(middlegame, Knight)[0]
+    knight_target = knight.get_available_moves(middlegame)[0]
+
+    def find_every_piece():
+        for piece in pieces:
+            middlegame.find_piece(piece)
+
+    yield 'board.find_piece (all pieces)', find_every_piece
+
+    # Each of these drops the cached check and pin analysis first, so that every call includes it
+    for piece_type in [Pawn, Knight, Bishop, Rook, Queen, King]:
+        typed = _pieces_of_type(middlegame, piece_type)
+
+        def generate(typed=typed):
+            middlegame.check_info_cache = None
+            for piece in typed:
+                piece.get_available_moves(middlegame)
+
+        yield f'{piece_type.__name__}.get_available_moves (all on board)', generate
+
+    def is_in_check():
+        middlegame.check_info_cache = None
+        king.is_in_check(middlegame)
+
+    def is_illegal_move():
+        middlegame.check_info_cache = None
+        knight._is_illegal_move(middlegame, knight_target)
+
+    yield 'Piece.is_in_check', is_in_check
+    yield 'Piece._is_illegal_move', is_illegal_move
+
+    for name, board in boards.items():
+        # Drop the cached check and pin analysis so that every call includes it
+        def generate_all(board=board):
+            board.check_info_cache = None
+            board.legal_moves()
+
+        yield f'board.legal_moves ({name})', generate_all
+
+    searcher = Searcher()
+    yield 'Searcher.search (middlegame, depth 3)', lambda: searcher.search(middlegame, depth=3)
+
+
+def _batch_benchmarks():
+    names = ['evaluate_batch (10000 positions)', 'analyse_batch (10000 positions)']
+    try:
+        from chessington.engine.batch import encode_boards, evaluate_batch, encode_bitboards, analyse_batch
+        boards = (list(_corpus_boards().values()) * 1667)[:10000]
+        codes, black_to_move = encode_boards(boards)
+        bitboards, _ = encode_bitboards(boards)
+    except ImportError as error:  # no NumPy
+        for name in names:
+            yield name, error
+        return
+
+    yield names[0], lambda: evaluate_batch(codes, black_to_move)
+    yield names[1], lambda: analyse_batch(bitboards, black_to_move)
+
+
+def _image_benchmarks():
+    name = 'ImageRepository.get_image'
+    try:
+        import tkinter as tk
+        from chessington.ui.colours import Colour
+        from chessington.ui.images import ImageRepository
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as error:  # no PIL, no Tk or no display
+        yield name, error
+        return
+
+    # PhotoImage needs the Tk root, so it is only destroyed once the benchmark has been measured
+    try:
+        images = ImageRepository()
+        piece = Queen(Player.WHITE)
+        yield name, lambda: images.get_image(piece, Colour.WHITE_SQUARE)
+    finally:
+        root.destroy()
+
+
+def run(name_filter='', min_time=0.2):
+    # Each benchmark is measured as it is yielded, while whatever its generator set up is still alive
+    results = []
+    for name, func in chain(_engine_benchmarks(), _batch_benchmarks(), _image_benchmarks()):
+        if name_filter not in name:
+            continue
+        if isinstance(func, Exception):
+            results.append(skipped(name, f'{type(func).__name__}: {func}'))
+        else:
+            results.append(measure(name, func, min_time=min_time))
+    return results
+
+
+def _print_table(results):
+    width = max(len(result.name) for result in results)
+    print(f'{"benchmark":<{width}}  {"ops/sec":>12}  {"p50 us":>10}  {"p90 us":>10}  {"p99 us":>10}')
+    for result in results:
+        if result.skipped:
+            print(f'{result.name:<{width}}  skipped ({result.skipped})')
+        else:
+            print(f'{result.name:<{width}}  {result.ops_per_sec:>12.1f}  {result.p50_us:>10.2f}  '
+                  f'{result.p90_us:>10.2f}  {result.p99_us:>10.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the chessington engine hot paths.')
+    parser.add_argument('--output', default='benchmark-results.json', help='where to write the JSON results')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=0.2, help='approximate seconds spent timing each benchmark')
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.min_time)
+    _print_table(results)
+
+    with open(args.output, 'w') as output:
+        json.dump({
+            'timestamp': time.time(),
+            'python': sys.version,
+            'platform': platform.platform(),
+            'results': [result.to_dict() for result in results],
+        }, output, indent=2)
+    print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+A small timing harness: runs a benchmark in timed batches and summarises the per-call times.
+"""
+
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+
+@dataclass
+class Result:
+    name: str
+    calls: int
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p90_us: float
+    p99_us: float
+    skipped: Optional[str] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def percentile(sorted_values, fraction):
+    """The value at the given fraction (0-1) of an already sorted list, by nearest rank"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name: str, func: Callable[[], object], min_time: float = 0.2, batches: int = 30) -> Result:
+    """
+    Time func by calling it repeatedly. The batch size is calibrated so that all the batches together
+    take roughly min_time seconds, and the per-call time of each batch is one sample.
+    """
+    batch_size = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch_size):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed * batches >= min_time or batch_size >= 1 << 20:
+            break
+        batch_size *= 2
+
+    samples = []
+    for _ in range(batches):
+        start = time.perf_counter_ns()
+        for _ in range(batch_size):
+            func()
+        samples.append((time.perf_counter_ns() - start) / batch_size / 1000)
+
+    samples.sort()
+    mean = statistics.mean(samples)
+    return Result(
+        name=name,
+        calls=batch_size * batches,
+        ops_per_sec=1e6 / mean if mean else float('inf'),
+        mean_us=mean,
+        p50_us=percentile(samples, 0.5),
+        p90_us=percentile(samples, 0.9),
+        p99_us=percentile(samples, 0.99),
+    )
+
+
+def skipped(name: str, reason: str) -> Result:
+    return Result(name=name, calls=0, ops_per_sec=0.0, mean_us=0.0, p50_us=0.0, p90_us=0.0, p99_us=0.0,
+                  skipped=reason)
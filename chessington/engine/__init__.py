@@ -0,0 +1 @@
+from chessington.engine.profiling import profile
@@ -0,0 +1,79 @@
+"""
+Precomputed attack tables, built once at import time.
+
+Every table is indexed by Square.index (row * 8 + col). Targets and rays only ever contain squares
+that are on the board, so code iterating them needs no bounds checks. Rays are ordered outwards
+from their starting square.
+"""
+
+from chessington.engine.data import Player, Square
+
+BOARD_SIZE = 8
+
+SQUARES = tuple(Square.from_index(index) for index in range(BOARD_SIZE * BOARD_SIZE))
+
+KNIGHT_OFFSETS = [(1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1)]
+KING_OFFSETS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (-1, -1), (1, -1)]
+LATERAL_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIAGONAL_DIRECTIONS = [(1, 1), (-1, 1), (-1, -1), (1, -1)]
+PAWN_DIRECTIONS = {Player.WHITE: 1, Player.BLACK: -1}
+
+
+def _on_board(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _mask(squares):
+    mask = 0
+    for square in squares:
+        mask |= 1 << square.index
+    return mask
+
+
+def _leaper_targets(offsets):
+    return tuple(
+        tuple(Square.at(square.row + row_offset, square.col + col_offset)
+              for row_offset, col_offset in offsets
+              if _on_board(square.row + row_offset, square.col + col_offset))
+        for square in SQUARES)
+
+
+def _rays(directions):
+    rays = []
+    for square in SQUARES:
+        square_rays = []
+        for row_step, col_step in directions:
+            ray = []
+            row, col = square.row + row_step, square.col + col_step
+            while _on_board(row, col):
+                ray.append(Square.at(row, col))
+                row, col = row + row_step, col + col_step
+            square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+    return tuple(rays)
+
+
+def _pawn_attacks(player):
+    direction = PAWN_DIRECTIONS[player]
+    return _leaper_targets([(direction, -1), (direction, 1)])
+
+
+def _pawn_pushes(player):
+    direction = PAWN_DIRECTIONS[player]
+    return tuple(
+        Square.at(square.row + direction, square.col) if _on_board(square.row + direction, square.col) else None
+        for square in SQUARES)
+
+
+KNIGHT_TARGETS = _leaper_targets(KNIGHT_OFFSETS)
+KING_TARGETS = _leaper_targets(KING_OFFSETS)
+LATERAL_RAYS = _rays(LATERAL_DIRECTIONS)
+DIAGONAL_RAYS = _rays(DIAGONAL_DIRECTIONS)
+PAWN_ATTACKS = {player: _pawn_attacks(player) for player in Player}
+PAWN_PUSHES = {player: _pawn_pushes(player) for player in Player}
+
+KNIGHT_MASKS = tuple(_mask(targets) for targets in KNIGHT_TARGETS)
+KING_MASKS = tuple(_mask(targets) for targets in KING_TARGETS)
+PAWN_ATTACK_MASKS = {player: tuple(_mask(targets) for targets in PAWN_ATTACKS[player]) for player in Player}
+LATERAL_RAY_MASKS = tuple(tuple(_mask(ray) for ray in rays) for rays in LATERAL_RAYS)
+DIAGONAL_RAY_MASKS = tuple(tuple(_mask(ray) for ray in rays) for rays in DIAGONAL_RAYS)
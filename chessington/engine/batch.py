@@ -0,0 +1,309 @@
+"""
+Analysing many positions at once with NumPy.
+
+Batches come in two layouts, each with an (N,) bool array that is true where black is to move:
+
+* piece codes, an (N, 64) int8 array with one row per position in square index order: 0 for an empty
+  square, the piece's kind code plus 1 for a white piece, and minus that for a black one.
+  evaluate_batch scores every row with the material and piece-square tables of the evaluation module.
+* bitboards, an (N, 2, 6) uint64 array holding each position's bitboards for white then black, in
+  order of kind codes. analyse_batch counts the moves, maps the attacks and finds the checks in every
+  position by shifting and masking whole columns of bitboards at once.
+
+Neither loops over positions or squares in Python. NumPy is an optional dependency (install the
+"batch" extra); the rest of the engine does not need it.
+"""
+
+from typing import NamedTuple, Any
+
+from chessington.engine.board import BOARD_SIZE, PAWN_ROWS
+from chessington.engine.data import Player
+from chessington.engine.evaluation import SQUARE_VALUES
+from chessington.engine.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+SQUARES = BOARD_SIZE * BOARD_SIZE
+DEFAULT_CHUNK_SIZE = 65536
+
+# Piece codes run from -6 to 6; adding this makes them row indices into the score table
+_CODE_OFFSET = 6
+
+_score_table = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('The batch module needs NumPy; install it with the "batch" extra')
+
+
+def piece_code(piece):
+    """
+    The int8 code of a piece, or of an empty square for None.
+    """
+    if piece is None:
+        return 0
+    return piece.kind + 1 if piece.player == Player.WHITE else -(piece.kind + 1)
+
+
+def encode_boards(boards):
+    """
+    Packs boards into a batch: an (N, 64) int8 array of piece codes, and an (N,) bool array that is
+    true where black is to move.
+    """
+    _require_numpy()
+    placement = bytearray()
+    black_to_move = []
+    for board in boards:
+        for row in board.board:
+            placement.extend(piece_code(piece) & 0xFF for piece in row)
+        black_to_move.append(board.current_player == Player.BLACK)
+    codes = np.frombuffer(bytes(placement), dtype=np.int8).reshape(-1, SQUARES)
+    return codes, np.array(black_to_move, dtype=bool)
+
+
+def _scores_by_code():
+    # A (13, 64) table of each piece code's score on each square, from white's point of view
+    global _score_table
+    if _score_table is None:
+        table = np.zeros((2 * _CODE_OFFSET + 1, SQUARES), dtype=np.int32)
+        for kind in range(_CODE_OFFSET):
+            table[_CODE_OFFSET + kind + 1] = SQUARE_VALUES[Player.WHITE][kind]
+            table[_CODE_OFFSET - kind - 1] = [-value for value in SQUARE_VALUES[Player.BLACK][kind]]
+        _score_table = table
+    return _score_table
+
+
+def evaluate_batch(codes, black_to_move=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Scores every position in an (N, 64) array of piece codes, returning an (N,) int32 array of material
+    plus piece-square table scores. Scores are from white's point of view, or from the point of view of
+    the player to move if black_to_move is given, matching evaluation.evaluate.
+
+    Positions are scored chunk_size rows at a time, which bounds the size of the intermediate arrays.
+    """
+    _require_numpy()
+    codes = np.asarray(codes)
+    if codes.ndim != 2 or codes.shape[1] != SQUARES:
+        raise ValueError(f'Expected an (N, {SQUARES}) array of piece codes, not {codes.shape}')
+
+    table = _scores_by_code()
+    square_indices = np.arange(SQUARES)
+    scores = np.empty(len(codes), dtype=np.int32)
+    for start in range(0, len(codes), chunk_size):
+        chunk = codes[start:start + chunk_size].astype(np.intp) + _CODE_OFFSET
+        scores[start:start + chunk_size] = table[chunk, square_indices].sum(axis=1)
+
+    if black_to_move is not None:
+        scores[np.asarray(black_to_move, dtype=bool)] *= -1
+    return scores
+
+
+# The players in the order of a bitboard batch's second axis
+BATCH_PLAYERS = (Player.WHITE, Player.BLACK)
+
+
+def encode_bitboards(boards):
+    """
+    Packs boards into a batch: an (N, 2, 6) uint64 array of bitboards, and an (N,) bool array that is
+    true where black is to move.
+    """
+    _require_numpy()
+    bitboards = np.array([[board.bitboards[player] for player in BATCH_PLAYERS] for board in boards],
+                         dtype=np.uint64).reshape(-1, len(BATCH_PLAYERS), KING + 1)
+    black_to_move = np.array([board.current_player == Player.BLACK for board in boards], dtype=bool)
+    return bitboards, black_to_move
+
+
+class BatchAnalysis(NamedTuple):
+    """
+    Per-position results of analyse_batch, as arrays over the batch.
+
+    pseudo_legal and legal count the moves of the player to move before and after discarding those
+    that leave their king in check, as Piece.get_available_moves does. attacks holds the squares each
+    player attacks, white then black, as legality.attacked_squares. in_check is true where the player
+    to move is in check, as Piece.is_in_check.
+    """
+    pseudo_legal: Any
+    legal: Any
+    attacks: Any
+    in_check: Any
+
+
+def _file_mask(col):
+    return sum(1 << (row * BOARD_SIZE + col) for row in range(BOARD_SIZE))
+
+
+def _rank_mask(row):
+    return ((1 << BOARD_SIZE) - 1) << (row * BOARD_SIZE)
+
+
+_FULL = (1 << 64) - 1
+_NOT_A = _FULL ^ _file_mask(0)
+_NOT_H = _FULL ^ _file_mask(BOARD_SIZE - 1)
+_NOT_AB = _NOT_A & (_FULL ^ _file_mask(1))
+_NOT_GH = _NOT_H & (_FULL ^ _file_mask(BOARD_SIZE - 2))
+
+# Shifts by square index for each step, with the mask that drops the squares a step wrapped onto
+_LATERAL_STEPS = ((8, _FULL), (-8, _FULL), (1, _NOT_A), (-1, _NOT_H))
+_DIAGONAL_STEPS = ((9, _NOT_A), (7, _NOT_H), (-7, _NOT_A), (-9, _NOT_H))
+_KNIGHT_STEPS = ((17, _NOT_A), (15, _NOT_H), (10, _NOT_AB), (6, _NOT_GH),
+                 (-6, _NOT_AB), (-10, _NOT_GH), (-15, _NOT_A), (-17, _NOT_H))
+_KING_STEPS = _LATERAL_STEPS + _DIAGONAL_STEPS
+_PAWN_PUSH_STEPS = {Player.WHITE: (8, _FULL), Player.BLACK: (-8, _FULL)}
+_PAWN_CAPTURE_STEPS = {Player.WHITE: ((9, _NOT_A), (7, _NOT_H)), Player.BLACK: ((-7, _NOT_A), (-9, _NOT_H))}
+# A pawn's second step lands on this rank only if it started from its starting row
+_DOUBLE_PUSH_RANKS = {Player.WHITE: _rank_mask(PAWN_ROWS[Player.WHITE] + 2),
+                      Player.BLACK: _rank_mask(PAWN_ROWS[Player.BLACK] - 2)}
+
+
+def _shift(bitboards, step):
+    amount, mask = step
+    if amount > 0:
+        shifted = bitboards << np.uint64(amount)
+    else:
+        shifted = bitboards >> np.uint64(-amount)
+    return shifted & np.uint64(mask)
+
+
+def _slide(sliders, empty, step):
+    # The squares reached from the sliders in one direction, up to and including the first blocker
+    reached = np.zeros_like(sliders)
+    frontier = sliders
+    for _ in range(BOARD_SIZE - 1):
+        frontier = _shift(frontier, step)
+        reached |= frontier
+        frontier &= empty
+    return reached
+
+
+def _popcount(bitboards):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitboards).astype(np.int64)
+    x = bitboards - ((bitboards >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def _attacks(pieces, occupied, player):
+    # The squares attacked by one player's pieces, given as a list of bitboard columns by kind
+    attacked = np.zeros_like(occupied)
+    empty = ~occupied
+    for step in _PAWN_CAPTURE_STEPS[player]:
+        attacked |= _shift(pieces[PAWN], step)
+    for step in _KNIGHT_STEPS:
+        attacked |= _shift(pieces[KNIGHT], step)
+    for step in _KING_STEPS:
+        attacked |= _shift(pieces[KING], step)
+    for steps, sliders in ((_LATERAL_STEPS, pieces[ROOK] | pieces[QUEEN]),
+                           (_DIAGONAL_STEPS, pieces[BISHOP] | pieces[QUEEN])):
+        for step in steps:
+            attacked |= _slide(sliders, empty, step)
+    return attacked
+
+
+def _count_moves(pieces, targets, pawn_targets, empty, enemy_all, player):
+    # Counts the moves of the given non-king pieces onto the target squares, with pawns restricted to
+    # their own targets. Along any one step each target is reached by at most one piece, so counting
+    # the squares reached by all the pieces at once counts their moves.
+    count = np.zeros(len(empty), dtype=np.int64)
+    push = _shift(pieces[PAWN], _PAWN_PUSH_STEPS[player]) & empty
+    double = _shift(push, _PAWN_PUSH_STEPS[player]) & empty & np.uint64(_DOUBLE_PUSH_RANKS[player])
+    count += _popcount(push & pawn_targets) + _popcount(double & pawn_targets)
+    for step in _PAWN_CAPTURE_STEPS[player]:
+        count += _popcount(_shift(pieces[PAWN], step) & enemy_all & pawn_targets)
+    for step in _KNIGHT_STEPS:
+        count += _popcount(_shift(pieces[KNIGHT], step) & targets)
+    for steps, sliders in ((_LATERAL_STEPS, pieces[ROOK] | pieces[QUEEN]),
+                           (_DIAGONAL_STEPS, pieces[BISHOP] | pieces[QUEEN])):
+        for step in steps:
+            count += _popcount(_slide(sliders, empty, step) & targets)
+    return count
+
+
+def _side_stats(own, enemy, player):
+    # Move counts and check flags for positions where the given player is to move
+    zero = np.zeros_like(own[PAWN])
+    full = np.uint64(_FULL)
+    own_all = np.bitwise_or.reduce(own)
+    enemy_all = np.bitwise_or.reduce(enemy)
+    occupied = own_all | enemy_all
+    empty = ~occupied
+    king = own[KING]
+
+    # Checks and pins, looking out from the king along each line. block holds the squares a non-king
+    # move must land on to deal with a single check, and each pin the line its pinned piece may use.
+    checkers = zero.copy()
+    for step in _KNIGHT_STEPS:
+        checkers |= _shift(king, step) & enemy[KNIGHT]
+    for step in _PAWN_CAPTURE_STEPS[player]:
+        checkers |= _shift(king, step) & enemy[PAWN]
+    block = checkers.copy()
+    pinned = zero.copy()
+    pins = []
+    for steps, sliders, own_sliders in ((_LATERAL_STEPS, enemy[ROOK] | enemy[QUEEN], own[ROOK] | own[QUEEN]),
+                                        (_DIAGONAL_STEPS, enemy[BISHOP] | enemy[QUEEN], own[BISHOP] | own[QUEEN])):
+        for step in steps:
+            line = _slide(king, empty, step)
+            checking = line & sliders
+            checkers |= checking
+            block |= np.where(checking != 0, line, zero)
+
+            shield = line & own_all
+            line_beyond = _slide(king, empty | shield, step)
+            is_pin = (shield != 0) & ((line_beyond & ~shield & sliders) != 0)
+            pinned_here = np.where(is_pin, shield, zero)
+            pinned |= pinned_here
+            pins.append((pinned_here, own_sliders, np.where(is_pin, line_beyond, zero)))
+
+    in_check = checkers != 0
+    block = np.where(in_check, block, full)
+    block = np.where(_popcount(checkers) > 1, zero, block)
+    danger = _attacks(enemy, occupied & ~king, player.opponent())
+
+    pseudo_legal = _count_moves(own, ~own_all, full, empty, enemy_all, player)
+    free = [bitboard & ~pinned for bitboard in own]
+    legal = _count_moves(free, ~own_all & block, block, empty, enemy_all, player)
+    for step in _KING_STEPS:
+        king_targets = _shift(king, step) & ~own_all
+        pseudo_legal += _popcount(king_targets)
+        legal += _popcount(king_targets & ~danger)
+
+    # A pinned piece may only move along its pin line, and never while its king is in check. A pinned
+    # slider that moves along the line may go anywhere on it, up to and including the pinning piece.
+    for pinned_here, own_sliders, line in pins:
+        line = np.where(in_check, zero, line)
+        legal += np.where(((pinned_here & own_sliders) != 0) & ~in_check, _popcount(line) - 1, 0)
+        pinned_pawns = [pinned_here & own[PAWN]] + [zero] * KING
+        legal += _count_moves(pinned_pawns, zero, line, empty, enemy_all, player)
+
+    return pseudo_legal, legal, in_check
+
+
+def analyse_batch(bitboards, black_to_move):
+    """
+    Counts the pseudo-legal and legal moves, maps the attacks and finds the checks in every position
+    of a bitboard batch, returning a BatchAnalysis.
+
+    As in FEN, pawns may make a double step only from their starting row.
+    """
+    _require_numpy()
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    if bitboards.ndim != 3 or bitboards.shape[1:] != (len(BATCH_PLAYERS), KING + 1):
+        raise ValueError(f'Expected an (N, 2, {KING + 1}) array of bitboards, not {bitboards.shape}')
+    black_to_move = np.asarray(black_to_move, dtype=bool)
+
+    pieces = {player: [bitboards[:, side, kind] for kind in range(KING + 1)]
+              for side, player in enumerate(BATCH_PLAYERS)}
+    occupied = np.bitwise_or.reduce(bitboards.reshape(len(bitboards), -1), axis=1)
+    attacks = np.stack([_attacks(pieces[player], occupied, player) for player in BATCH_PLAYERS], axis=1)
+
+    white = _side_stats(pieces[Player.WHITE], pieces[Player.BLACK], Player.WHITE)
+    black = _side_stats(pieces[Player.BLACK], pieces[Player.WHITE], Player.BLACK)
+    pseudo_legal, legal, in_check = (np.where(black_to_move, black_stat, white_stat)
+                                     for white_stat, black_stat in zip(white, black))
+    return BatchAnalysis(pseudo_legal, legal, attacks, in_check)
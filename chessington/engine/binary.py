@@ -0,0 +1,214 @@
+"""
+A fixed-width binary encoding of board positions, and memory-mapped files of them.
+
+Each position takes RECORD_SIZE (36) bytes:
+
+* 32 bytes of piece placement, one nibble per square in square index order (low nibble first). A
+  nibble holds 0 for an empty square, or the piece's kind code plus 1, plus 8 for black pieces.
+* 1 byte of flags: bit 0 is set when black is to move, and bits 1-4 hold the castling rights K, Q, k
+  and q. As in FEN, the castling rights stand for the moved flags of kings and rooks, and pawns count
+  as moved unless they are on their starting row.
+* 1 byte of halfmove clock (capped at 255) and 2 bytes of fullmove number, little-endian.
+
+A position file is an 8-byte header followed by the records back to back.
+
+A game file is an 8-byte header followed by the games back to back. Each game is the record of its
+starting position, a 2-byte move count and that many encoded moves (see the moves module) of 2 bytes
+each, all little-endian.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+from chessington.engine.board import Board, PIECE_TYPES, CASTLING_RIGHTS, BOARD_SIZE
+from chessington.engine.data import Player
+
+MAGIC = b'CHESSPOS'
+RECORD = struct.Struct('<32sBBH')
+RECORD_SIZE = RECORD.size
+
+GAME_MAGIC = b'CHESSGAM'
+MOVE_COUNT = struct.Struct('<H')
+
+_BLACK_NIBBLE = 8
+_BLACK_TO_MOVE = 1
+
+
+def encode_position(board):
+    """
+    Packs the board's position into RECORD_SIZE bytes.
+    """
+    placement = bytearray(BOARD_SIZE * BOARD_SIZE // 2)
+    for row in range(BOARD_SIZE):
+        for col, piece in enumerate(board.board[row]):
+            if piece is not None:
+                index = row * BOARD_SIZE + col
+                nibble = piece.kind + 1 + (_BLACK_NIBBLE if piece.player == Player.BLACK else 0)
+                placement[index >> 1] |= nibble << (4 * (index & 1))
+
+    castling = board.castling_rights()
+    flags = _BLACK_TO_MOVE if board.current_player == Player.BLACK else 0
+    for bit, (_, letter, _) in enumerate(CASTLING_RIGHTS):
+        if letter in castling:
+            flags |= 2 << bit
+
+    return RECORD.pack(bytes(placement), flags, min(board.halfmove_clock, 255), board.fullmove_number)
+
+
+def decode_position(data, flyweight=False):
+    """
+    Creates a board from a position packed by encode_position. `data` may be any bytes-like object
+    holding exactly one record, such as a slice of a memory map. Raises ValueError if the record holds a
+    nibble that is not a piece.
+    """
+    placement, flags, halfmove_clock, fullmove_number = RECORD.unpack(data)
+    castling = ''.join(letter for bit, (_, letter, _) in enumerate(CASTLING_RIGHTS) if flags & (2 << bit))
+
+    create = (lambda piece_type, player: piece_type.shared(player)) if flyweight else \
+        (lambda piece_type, player: piece_type(player))
+    board_state = Board._create_empty_board()
+    moved_mask = 0
+    for byte_index, byte in enumerate(placement):
+        if not byte:
+            continue
+        for half in range(2):
+            nibble = (byte >> (4 * half)) & 0xF
+            if not nibble:
+                continue
+            index = 2 * byte_index + half
+            row, col = divmod(index, BOARD_SIZE)
+            kind = (nibble & 7) - 1
+            if not 0 <= kind < len(PIECE_TYPES):
+                raise ValueError(f'Square {index} holds {nibble:#x}, which is not a piece')
+            piece_type = PIECE_TYPES[kind]
+            player = Player.BLACK if nibble & _BLACK_NIBBLE else Player.WHITE
+            piece = board_state[row][col] = create(piece_type, player)
+            if Board._moved_from_fen(piece_type, player, row, col, castling):
+                if flyweight:
+                    moved_mask |= 1 << index
+                else:
+                    piece.moved = True
+
+    board = Board(Player.BLACK if flags & _BLACK_TO_MOVE else Player.WHITE, board_state, flyweight, moved_mask)
+    board.halfmove_clock = halfmove_clock
+    board.fullmove_number = fullmove_number
+    return board
+
+
+def write_positions(path, boards):
+    """
+    Writes the positions of the given boards to a position file, returning how many were written.
+    """
+    count = 0
+    with open(path, 'wb') as output:
+        output.write(MAGIC)
+        for board in boards:
+            output.write(encode_position(board))
+            count += 1
+    return count
+
+
+def write_games(path, games):
+    """
+    Writes games, given as (board, moves) pairs of the starting position and its encoded moves, to a
+    game file, returning how many were written.
+    """
+    count = 0
+    with open(path, 'wb') as output:
+        output.write(GAME_MAGIC)
+        for board, moves in games:
+            moves = array('H', moves)
+            if sys.byteorder == 'big':
+                moves.byteswap()
+            output.write(encode_position(board))
+            output.write(MOVE_COUNT.pack(len(moves)))
+            output.write(moves.tobytes())
+            count += 1
+    return count
+
+
+def read_games(path):
+    """
+    Streams the games in a game file as (record, moves) pairs: the starting position packed as by
+    encode_position (decode it with decode_position) and an array of its encoded moves. The file is
+    read one game at a time.
+    """
+    with open(path, 'rb') as games:
+        if games.read(len(GAME_MAGIC)) != GAME_MAGIC:
+            raise ValueError(f'{path} is not a game file')
+        while True:
+            record = games.read(RECORD_SIZE)
+            if not record:
+                return
+            count = games.read(MOVE_COUNT.size)
+            if len(record) != RECORD_SIZE or len(count) != MOVE_COUNT.size:
+                raise ValueError(f'{path} ends part way through a game')
+            size = 2 * MOVE_COUNT.unpack(count)[0]
+            data = games.read(size)
+            if len(data) != size:
+                raise ValueError(f'{path} ends part way through a game')
+            moves = array('H')
+            moves.frombytes(data)
+            if sys.byteorder == 'big':
+                moves.byteswap()
+            yield record, moves
+
+
+class PositionFile:
+    """
+    A read-only, memory-mapped position file. Positions are decoded one at a time as they are asked
+    for, so the file is never loaded into memory as a whole, and processes reading the same file share
+    its pages through the operating system's page cache.
+
+    Boards are built in flyweight mode unless flyweight=False is given.
+    """
+
+    def __init__(self, path, flyweight=True):
+        self.flyweight = flyweight
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f'{path} is not a position file')
+        if self._map[:len(MAGIC)] != MAGIC or (len(self._map) - len(MAGIC)) % RECORD_SIZE:
+            self.close()
+            raise ValueError(f'{path} is not a position file')
+
+    def __len__(self):
+        return (len(self._map) - len(MAGIC)) // RECORD_SIZE
+
+    def record(self, index):
+        """
+        The raw bytes of the position at the given index, as a view onto the file. Release the view when
+        done with it, as __getitem__ does: the file cannot be closed while views onto it are held.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f'Position {index} is out of range')
+        start = len(MAGIC) + index * RECORD_SIZE
+        return memoryview(self._map)[start:start + RECORD_SIZE]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        record = self.record(index)
+        try:
+            return decode_position(record, self.flyweight)
+        finally:
+            record.release()
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,89 +1,474 @@
 """
 A module providing a representation of a chess board. The rules of chess are not implemented - 
 this is just a "dumb" board that will let you move pieces around as you like.
+
+Alongside the 8x8 grid of pieces the board keeps a set of bitboards: one 64-bit integer per
+piece type and colour, where bit (row * 8 + col) is set if such a piece stands on that square.
+It also indexes each piece by its square, so that pieces and kings can be located directly.
+
+A board can also keep running totals of each player's material and piece-square table bonuses, so
+that evaluating it does not mean scanning it (see track_eval_terms).
+
+A board can instead be built in flyweight mode, holding the shared instance of each piece type
+and colour (see Piece.shared). It then keeps the pieces' moved flags itself, as a bitboard, and
+pieces are located through the bitboards.
 """
 
-from chessington.engine.data import Player, Square
-from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from array import array
+
+from chessington.engine.data import Player, Square, Undo
+from chessington.engine.evaluation import EvalTerms, PIECE_VALUES, PLACEMENT_VALUES
+from chessington.engine.moves import encode_move, CAPTURE, DOUBLE_PAWN_PUSH
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PAWN, ROOK, KING
+from chessington.engine.zobrist import PIECE_KEYS, MOVED_PAWN_KEYS, BLACK_TO_MOVE_KEY, CASTLING_KEYS
 
 
 BOARD_SIZE = 8
 
+# Piece types in order of their kind codes
+PIECE_TYPES = [Pawn, Knight, Bishop, Rook, Queen, King]
+
+# FEN letters for each piece type, in order of their kind codes
+FEN_LETTERS = 'pnbrqk'
+FEN_PIECES = {letter: piece_type for letter, piece_type in zip(FEN_LETTERS, PIECE_TYPES)}
+
+# The rows each player's pieces and pawns start on
+HOME_ROWS = {Player.WHITE: 0, Player.BLACK: BOARD_SIZE - 1}
+PAWN_ROWS = {Player.WHITE: 1, Player.BLACK: BOARD_SIZE - 2}
+
+# FEN castling letters, with the column of the rook each one depends on
+CASTLING_RIGHTS = [(Player.WHITE, 'K', 7), (Player.WHITE, 'Q', 0), (Player.BLACK, 'k', 7), (Player.BLACK, 'q', 0)]
+KING_COL = 4
+
+# The squares whose pieces decide the castling rights: each player's king and rook home squares
+CASTLING_SQUARES = sum(1 << (HOME_ROWS[player] * BOARD_SIZE + col)
+                       for player in (Player.WHITE, Player.BLACK) for col in (0, KING_COL, 7))
+
+
+def square_bit(square):
+    """
+    The bitboard mask with only the given square set.
+    """
+    return 1 << square.index
+
+
 class Board:
     """
     A representation of the chess board, and the pieces on it.
+
+    The board keeps a Zobrist hash of the position in `zobrist`, and boards compare equal when they
+    hold the same position. As in FEN, the hash covers the castling rights, kept in `castling` as a bit
+    per entry of CASTLING_RIGHTS, rather than the moved flags of kings and rooks. A piece's moved flag
+    should only be changed while it is off the board, as make_move and move_piece do, so that the hash
+    and castling rights stay in step with it.
     """
 
-    def __init__(self, player, board_state):
-        self.current_player = Player.WHITE
+    def __init__(self, player, board_state, flyweight=False, moved_mask=0):
+        self.flyweight = flyweight
+        self.moved_mask = moved_mask if flyweight else 0
+        self.zobrist = BLACK_TO_MOVE_KEY if player == Player.BLACK else 0
+        self._current_player = player
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
         self.board = board_state
         self.pieces = {Player.WHITE: {}, Player.BLACK: {}}
+        self.bitboards = {Player.WHITE: [0] * len(PIECE_TYPES), Player.BLACK: [0] * len(PIECE_TYPES)}
+        self.occupancy = {Player.WHITE: 0, Player.BLACK: 0}
+        self.kings = {Player.WHITE: None, Player.BLACK: None}
+        self.undo_stack = []
+        self.check_info_cache = None
+        self.eval_terms = None
+
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if piece is not None:
+                    if flyweight and piece.moved:
+                        self.moved_mask |= 1 << Square.at(row, col).index
+                    self._add_to_index(Square.at(row, col), piece)
+        self.castling = self._castling_bits()
+        self.zobrist ^= CASTLING_KEYS[self.castling]
 
     @staticmethod
-    def empty():
-        return Board(Player.WHITE, Board._create_empty_board())
+    def empty(flyweight=False):
+        return Board(Player.WHITE, Board._create_empty_board(), flyweight)
 
     @staticmethod
-    def at_starting_position():
-        return Board(Player.WHITE, Board._create_starting_board())
+    def at_starting_position(flyweight=False):
+        return Board(Player.WHITE, Board._create_starting_board(flyweight), flyweight)
 
     @staticmethod
     def _create_empty_board():
         return [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
 
     @staticmethod
-    def _create_starting_board():
+    def _create_starting_board(flyweight=False):
+        create = (lambda piece, player: piece.shared(player)) if flyweight else (lambda piece, player: piece(player))
 
         # Create an empty board
         board = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
 
         # Setup the rows of pawns
-        board[1] = [Pawn(Player.WHITE) for _ in range(BOARD_SIZE)]
-        board[6] = [Pawn(Player.BLACK) for _ in range(BOARD_SIZE)]
+        board[1] = [create(Pawn, Player.WHITE) for _ in range(BOARD_SIZE)]
+        board[6] = [create(Pawn, Player.BLACK) for _ in range(BOARD_SIZE)]
 
         # Setup the rows of pieces
         piece_row = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        board[0] = list(map(lambda piece: piece(Player.WHITE), piece_row))
-        board[7] = list(map(lambda piece: piece(Player.BLACK), piece_row))
+        board[0] = list(map(lambda piece: create(piece, Player.WHITE), piece_row))
+        board[7] = list(map(lambda piece: create(piece, Player.BLACK), piece_row))
+
+        return board
+
+    @staticmethod
+    def from_fen(fen, flyweight=False):
+        """
+        Creates a board from a position in Forsyth-Edwards Notation.
+
+        The board has no notion of castling or en passant, so castling rights are mapped onto the moved
+        flags of kings and rooks, and the en passant square is ignored. Pawns count as moved unless they
+        are on their starting row.
+        """
+        fields = fen.split()
+        if not 1 <= len(fields) <= 6:
+            raise ValueError(f'Invalid FEN: {fen!r}')
+        placement = fields[0]
+        side = fields[1] if len(fields) > 1 else 'w'
+        castling = fields[2] if len(fields) > 2 else '-'
+
+        create = (lambda piece_type, player: piece_type.shared(player)) if flyweight else \
+            (lambda piece_type, player: piece_type(player))
+        board_state = Board._create_empty_board()
+        moved_mask = 0
+        row, col = BOARD_SIZE - 1, 0
+        for char in placement:
+            if char == '/':
+                if col != BOARD_SIZE or row == 0:
+                    raise ValueError(f'Invalid FEN placement: {placement!r}')
+                row, col = row - 1, 0
+            elif '1' <= char <= '8':
+                col += ord(char) - ord('0')
+            else:
+                piece_type = FEN_PIECES.get(char.lower())
+                if piece_type is None or col >= BOARD_SIZE:
+                    raise ValueError(f'Invalid FEN placement: {placement!r}')
+                player = Player.WHITE if char.isupper() else Player.BLACK
+                piece = board_state[row][col] = create(piece_type, player)
+                if Board._moved_from_fen(piece_type, player, row, col, castling):
+                    if flyweight:
+                        moved_mask |= 1 << (row * BOARD_SIZE + col)
+                    else:
+                        piece.moved = True
+                col += 1
+        if row != 0 or col != BOARD_SIZE:
+            raise ValueError(f'Invalid FEN placement: {placement!r}')
 
+        if side not in ('w', 'b'):
+            raise ValueError(f'Invalid FEN side to move: {side!r}')
+        board = Board(Player.WHITE if side == 'w' else Player.BLACK, board_state, flyweight, moved_mask)
+        try:
+            board.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            board.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f'Invalid FEN move counters: {fen!r}')
         return board
 
+    @staticmethod
+    def _moved_from_fen(piece_type, player, row, col, castling):
+        if piece_type is Pawn:
+            return row != PAWN_ROWS[player]
+        if piece_type is King:
+            return not (row == HOME_ROWS[player] and col == KING_COL and
+                        any(right_player == player and letter in castling
+                            for right_player, letter, _ in CASTLING_RIGHTS))
+        if piece_type is Rook:
+            return not (row == HOME_ROWS[player] and
+                        any(right_player == player and rook_col == col and letter in castling
+                            for right_player, letter, rook_col in CASTLING_RIGHTS))
+        return False
+
+    def to_fen(self):
+        """
+        Describes the position in Forsyth-Edwards Notation. Castling rights are given to each unmoved king
+        with an unmoved rook in its corner; the en passant square is always "-".
+        """
+        rows = []
+        for row in range(BOARD_SIZE - 1, -1, -1):
+            text = ''
+            empty = 0
+            for piece in self.board[row]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[piece.kind]
+                text += letter.upper() if piece.player == Player.WHITE else letter
+            rows.append(text + (str(empty) if empty else ''))
+
+        side = 'w' if self.current_player == Player.WHITE else 'b'
+        return f'{"/".join(rows)} {side} {self.castling_rights() or "-"} - {self.halfmove_clock} {self.fullmove_number}'
+
+    def castling_rights(self):
+        """
+        The FEN castling letters ("KQkq" or a subset) for each unmoved king with an unmoved rook in its
+        corner.
+        """
+        return ''.join(letter for bit, (_, letter, _) in enumerate(CASTLING_RIGHTS) if self.castling >> bit & 1)
+
+    def _castling_bits(self):
+        # The castling rights as a bit per entry of CASTLING_RIGHTS, worked out afresh from the pieces
+        castling = 0
+        for bit, (player, letter, rook_col) in enumerate(CASTLING_RIGHTS):
+            home_row = HOME_ROWS[player]
+            king = self.board[home_row][KING_COL]
+            rook = self.board[home_row][rook_col]
+            if king is not None and king.kind == KING and king.player == player and \
+                    rook is not None and rook.kind == ROOK and rook.player == player and \
+                    not self.has_moved(Square.at(home_row, KING_COL)) and \
+                    not self.has_moved(Square.at(home_row, rook_col)):
+                castling |= 1 << bit
+        return castling
+
+    @property
+    def current_player(self):
+        return self._current_player
+
+    @current_player.setter
+    def current_player(self, player):
+        if player != self._current_player:
+            self.zobrist ^= BLACK_TO_MOVE_KEY
+        self._current_player = player
+
+    def _zobrist_key(self, square, piece):
+        if piece.kind == PAWN and (self.moved_mask & square_bit(square) if self.flyweight else piece.moved):
+            return MOVED_PAWN_KEYS[piece.player][square.index]
+        return PIECE_KEYS[piece.player][piece.kind][square.index]
+
+    def __hash__(self):
+        return self.zobrist
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.zobrist == other.zobrist and self.current_player == other.current_player and \
+            self.bitboards == other.bitboards
+
+    def _add_to_index(self, square, piece):
+        bit = square_bit(square)
+        self.zobrist ^= self._zobrist_key(square, piece)
+        self.bitboards[piece.player][piece.kind] |= bit
+        self.occupancy[piece.player] |= bit
+        if not self.flyweight:
+            self.pieces[piece.player][piece] = square
+        if piece.kind == KING and self.kings[piece.player] is None:
+            self.kings[piece.player] = piece
+        terms = self.eval_terms
+        if terms is not None:
+            terms.material[piece.player] += PIECE_VALUES[piece.kind]
+            terms.placement[piece.player] += PLACEMENT_VALUES[piece.player][piece.kind][square.index]
+
+    def _remove_from_index(self, square, piece):
+        bit = square_bit(square)
+        self.zobrist ^= self._zobrist_key(square, piece)
+        self.bitboards[piece.player][piece.kind] &= ~bit
+        self.occupancy[piece.player] &= ~bit
+        terms = self.eval_terms
+        if terms is not None:
+            terms.material[piece.player] -= PIECE_VALUES[piece.kind]
+            terms.placement[piece.player] -= PLACEMENT_VALUES[piece.player][piece.kind][square.index]
+        if self.flyweight:
+            self.moved_mask &= ~bit
+            if not self.bitboards[piece.player][KING]:
+                self.kings[piece.player] = None
+            return
+
+        if self.pieces[piece.player].get(piece) == square:
+            del self.pieces[piece.player][piece]
+        if self.kings[piece.player] is piece:
+            self.kings[piece.player] = next(
+                (other for other in self.pieces[piece.player] if other.kind == KING), None)
+
+    def track_eval_terms(self):
+        """
+        Starts keeping eval_terms, an EvalTerms holding each player's material and piece-square table
+        totals, up to date as pieces are placed, moved, captured and taken back. Returns them.
+        """
+        if self.eval_terms is None:
+            terms = EvalTerms()
+            for player in (Player.WHITE, Player.BLACK):
+                for kind, mask in enumerate(self.bitboards[player]):
+                    while mask:
+                        lowest = mask & -mask
+                        mask ^= lowest
+                        terms.material[player] += PIECE_VALUES[kind]
+                        terms.placement[player] += PLACEMENT_VALUES[player][kind][lowest.bit_length() - 1]
+            self.eval_terms = terms
+        return self.eval_terms
+
+    @property
+    def occupied(self):
+        """
+        The bitboard of every occupied square, regardless of colour.
+        """
+        return self.occupancy[Player.WHITE] | self.occupancy[Player.BLACK]
+
+    def piece_mask(self, player, piece_type):
+        """
+        The bitboard of squares holding a piece of the given type and colour.
+        """
+        return self.bitboards[player][piece_type.kind]
+
+    def has_moved(self, square):
+        """
+        Whether the piece on the given square has moved.
+        """
+        if self.flyweight:
+            return bool(self.moved_mask & square_bit(square))
+        return self.board[square.row][square.col].moved
+
+    def _set_moved(self, square, piece, moved):
+        # Only called while the piece is lifted off the board, about to be placed on the given square
+        if self.flyweight:
+            if moved:
+                self.moved_mask |= square_bit(square)
+        else:
+            piece.moved = moved
+
+    def place_moved_piece(self, square, piece):
+        """
+        Places the piece at the given position on the board, marked as moved. Moves the board makes itself
+        never need this, but replaying games does: for the rook in castling and the piece a pawn promotes to.
+        """
+        self.set_piece(square, None)
+        self._set_moved(square, piece, True)
+        self.set_piece(square, piece)
+
     def set_piece(self, square, piece):
         """
         Places the piece at the given position on the board.
         """
+        if square.index is None:
+            raise IndexError(f'{square} is not on the board')
+        old_piece = self.board[square.row][square.col]
+        if old_piece is not None:
+            self._remove_from_index(square, old_piece)
+        if piece is not None:
+            self._add_to_index(square, piece)
         self.board[square.row][square.col] = piece
+        if CASTLING_SQUARES & square_bit(square):
+            castling = self._castling_bits()
+            self.zobrist ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+            self.castling = castling
 
     def get_piece(self, square):
         """
         Retrieves the piece from the given square of the board.
         """
+        if square.index is None:
+            raise IndexError(f'{square} is not on the board')
         return self.board[square.row][square.col]
 
     def find_piece(self, piece_to_find):
         """
         Searches for the given piece on the board and returns its square.
+
+        In flyweight mode pieces of the same type and colour cannot be told apart, so this only
+        succeeds when there is exactly one such piece on the board.
         """
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.board[row][col] is piece_to_find:
-                    return Square.at(row, col)
+        if self.flyweight:
+            mask = self.bitboards[piece_to_find.player][piece_to_find.kind]
+            if mask and not mask & (mask - 1):
+                return Square.from_index(mask.bit_length() - 1)
+            if mask:
+                raise Exception('The supplied piece is not the only one of its kind on the board')
+        else:
+            square = self.pieces[piece_to_find.player].get(piece_to_find)
+            if square is not None:
+                return square
         raise Exception('The supplied piece is not on the board')
 
     def move_piece(self, from_square, to_square):
         """
-        Moves the piece from the given starting square to the given destination square.
+        Moves the piece from the given starting square to the given destination square, if it belongs to the
+        player whose turn it is, and marks it as moved.
         """
         moving_piece = self.get_piece(from_square)
         if moving_piece is not None and moving_piece.player == self.current_player:
-            self.set_piece(to_square, moving_piece)
+            self._advance_move_counters(moving_piece, self.get_piece(to_square))
             self.set_piece(from_square, None)
+            self.set_piece(to_square, None)
+            self._set_moved(to_square, moving_piece, True)
+            self.set_piece(to_square, moving_piece)
             self.current_player = self.current_player.opponent()
 
+    def make_move(self, from_square, to_square):
+        """
+        Moves a piece whatever the side to move, marks it as moved and passes the turn to the other
+        player. The move can be taken back with unmake_move.
+        """
+        moving_piece = self.get_piece(from_square)
+        captured = self.get_piece(to_square)
+        self.undo_stack.append(Undo(from_square, to_square, captured,
+                                    captured is not None and self.has_moved(to_square),
+                                    self.has_moved(from_square), self.current_player, self.halfmove_clock))
+        self._advance_move_counters(moving_piece, captured)
+        self.set_piece(from_square, None)
+        if captured is not None:
+            self.set_piece(to_square, None)
+        self._set_moved(to_square, moving_piece, True)
+        self.set_piece(to_square, moving_piece)
+        self.current_player = moving_piece.player.opponent()
+
+    def unmake_move(self):
+        """
+        Takes back the last move made with make_move, restoring the board exactly as it was.
+        """
+        undo = self.undo_stack.pop()
+        moving_piece = self.get_piece(undo.to_square)
+        self.set_piece(undo.to_square, None)
+        if undo.captured is not None:
+            self._set_moved(undo.to_square, undo.captured, undo.captured_moved)
+            self.set_piece(undo.to_square, undo.captured)
+        self._set_moved(undo.from_square, moving_piece, undo.moved)
+        self.set_piece(undo.from_square, moving_piece)
+        self.current_player = undo.player
+        self.halfmove_clock = undo.halfmove_clock
+        if moving_piece.player == Player.BLACK:
+            self.fullmove_number -= 1
+
+    def _advance_move_counters(self, moving_piece, captured):
+        if moving_piece.kind == PAWN or captured is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if moving_piece.player == Player.BLACK:
+            self.fullmove_number += 1
+
+    def legal_moves(self, moves=None):
+        """
+        Lists every legal move for the player whose turn it is, as an array of encoded moves (see the
+        moves module), ordered by the square each move starts from. Given an array, this empties it and
+        fills it with the moves instead of creating a new one.
+        """
+        if moves is None:
+            moves = array('H')
+        else:
+            del moves[:]
+        opponent_mask = self.occupancy[self.current_player.opponent()]
+        own_mask = self.occupancy[self.current_player]
+        while own_mask:
+            lowest = own_mask & -own_mask
+            own_mask ^= lowest
+            from_square = Square.from_index(lowest.bit_length() - 1)
+            piece = self.board[from_square.row][from_square.col]
+            is_pawn = piece.kind == PAWN
+            for to_square in piece.get_available_moves_from(self, from_square):
+                flags = CAPTURE if opponent_mask & square_bit(to_square) else 0
+                if is_pawn and abs(to_square.row - from_square.row) == 2:
+                    flags |= DOUBLE_PAWN_PUSH
+                moves.append(encode_move(from_square, to_square, flags))
+        return moves
+
     def get_king(self, player):
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.board[row][col]
-                if isinstance(piece, King) and piece.player is player:
-                    return piece
-        return None
+        return self.kings[player]
@@ -0,0 +1,169 @@
+"""
+Opening books: the moves played from each position in a collection of games.
+
+A book file is an 8-byte header followed by RECORD_SIZE (12) byte records of a position's Zobrist
+hash (8 bytes), an encoded move (2 bytes, see the moves module) and the move's weight (2 bytes, the
+number of games it was played in), all little-endian. Records are sorted by hash and then move, so
+the moves for a position are found by binary search through a memory map of the file: opening a book
+reads nothing into memory, and processes using the same book share its pages through the operating
+system's page cache. The hash covers only what FEN records (see the zobrist module), so a board read
+from FEN finds the same book moves as one that reached the position by playing the game.
+"""
+
+import argparse
+import mmap
+import struct
+from collections import Counter
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player
+from chessington.engine.moves import move_flags, move_to_text, CASTLE, PROMOTION, EN_PASSANT
+from chessington.engine.perft import play_moves
+from chessington.engine.pgn import PgnReader
+
+MAGIC = b'CHESSBOK'
+RECORD = struct.Struct('<QHH')
+RECORD_SIZE = RECORD.size
+_HASH = struct.Struct('<Q')
+
+DEFAULT_MAX_PLIES = 20
+MAX_WEIGHT = (1 << 16) - 1
+
+
+def _ply(board):
+    return 2 * (board.fullmove_number - 1) + (board.current_player == Player.BLACK)
+
+
+def build_book(lines, path, max_plies=DEFAULT_MAX_PLIES, min_count=1):
+    """
+    Writes a book of the moves played in the first max_plies plies of the PGN games in `lines`, leaving
+    out moves played in fewer than min_count games. Returns the number of records written.
+    """
+    counts = Counter()
+    for _, board, move in PgnReader(lines):
+        if _ply(board) < max_plies:
+            counts[board.zobrist, move] += 1
+
+    records = sorted((key, move, min(count, MAX_WEIGHT))
+                     for (key, move), count in counts.items() if count >= min_count)
+    with open(path, 'wb') as output:
+        output.write(MAGIC)
+        for record in records:
+            output.write(RECORD.pack(*record))
+    return len(records)
+
+
+def is_playable(move):
+    """
+    Whether Board.make_move can play the move. The board has no castling, en passant or promotion, so
+    book moves of those kinds are passed over.
+    """
+    flags = move_flags(move)
+    return not (flags & (CASTLE | PROMOTION) or flags & EN_PASSANT == EN_PASSANT)
+
+
+class OpeningBook:
+    """
+    A read-only, memory-mapped book file.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f'{path} is not a book file')
+        if self._map[:len(MAGIC)] != MAGIC or (len(self._map) - len(MAGIC)) % RECORD_SIZE:
+            self.close()
+            raise ValueError(f'{path} is not a book file')
+
+    def __len__(self):
+        return (len(self._map) - len(MAGIC)) // RECORD_SIZE
+
+    def _hash_at(self, index):
+        return _HASH.unpack_from(self._map, len(MAGIC) + index * RECORD_SIZE)[0]
+
+    def entries(self, key):
+        """
+        The (move, weight) pairs recorded for the position with the given hash.
+        """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._hash_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        for index in range(low, len(self)):
+            record_key, move, weight = RECORD.unpack_from(self._map, len(MAGIC) + index * RECORD_SIZE)
+            if record_key != key:
+                break
+            entries.append((move, weight))
+        return entries
+
+    def moves(self, board):
+        """
+        The (move, weight) pairs for the board's position that the board can play.
+        """
+        return [(move, weight) for move, weight in self.entries(board.zobrist) if is_playable(move)]
+
+    def choose(self, board, rng=None):
+        """
+        A book move for the board's position, or None if it has none. The most played move is chosen,
+        or with a random.Random given, a move chosen at random in proportion to how often it was played.
+        """
+        moves = self.moves(board)
+        if not moves:
+            return None
+        if rng is None:
+            return max(moves, key=lambda entry: entry[1])[0]
+        return rng.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description='Build or look up an opening book.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='build a book from a PGN file')
+    build.add_argument('pgn', help='the PGN file of games to build the book from')
+    build.add_argument('book', help='the book file to write')
+    build.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES,
+                       help=f'plies of each game to include (default: {DEFAULT_MAX_PLIES})')
+    build.add_argument('--min-count', type=int, default=1,
+                       help='leave out moves played in fewer games than this (default: 1)')
+
+    probe = commands.add_parser('probe', help="list a position's book moves")
+    probe.add_argument('book', help='the book file to read')
+    probe.add_argument('--fen', help='the position to look up, in FEN (default: the starting position)')
+    probe.add_argument('--moves', nargs='*', default=[],
+                       help='moves in coordinate notation (e.g. e2e4) played from that position first')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Build an opening book from a PGN file, or list the book moves for a position"""
+    args = _parse_args(argv)
+    if args.command == 'build':
+        with open(args.pgn, encoding='utf-8', errors='replace') as lines:
+            count = build_book(lines, args.book, args.max_plies, args.min_count)
+        print(f'Wrote {count} moves to {args.book}')
+        return
+
+    board = Board.from_fen(args.fen) if args.fen else Board.at_starting_position()
+    board = play_moves(board, args.moves)
+    with OpeningBook(args.book) as book:
+        for move, weight in sorted(book.entries(board.zobrist), key=lambda entry: -entry[1]):
+            print(f'{move_to_text(move)}: {weight}')
@@ -0,0 +1,55 @@
+"""
+A cache of legal move lists, keyed by position.
+"""
+
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 65536
+
+
+class MoveCache:
+    """
+    Memoizes Piece.get_available_moves for a given position and square, evicting the least recently
+    used entries once more than max_entries move lists are held.
+
+    Entries are keyed by the board's Zobrist hash, which changes whenever set_piece, move_piece or
+    make_move alters the position, so a stale move list is never returned for a modified board.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError('The cache must be able to hold at least one entry')
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_available_moves(self, board, square):
+        """
+        Get all squares that the piece on the given square is allowed to move to.
+        """
+        key = (board.zobrist, square)
+        moves = self._entries.get(key)
+        if moves is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return list(moves)
+
+        self.misses += 1
+        piece = board.get_piece(square)
+        moves = tuple(piece.get_available_moves(board)) if piece is not None else ()
+        self._entries[key] = moves
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return list(moves)
+
+    def clear(self):
+        """
+        Drops every cached move list, leaving the counters untouched.
+        """
+        self._entries.clear()
@@ -1,8 +1,11 @@
 """
 Data classes for easy representation of concepts such as a square on the board or a player.
 """
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError
 from enum import Enum, auto
+from typing import NamedTuple, Optional
+
+BOARD_SIZE = 8
 
 class Player(Enum):
     """
@@ -16,10 +19,30 @@ class Player(Enum):
         else: return Player.WHITE
 
 
-@dataclass(frozen=True)
 class Square:
-    row: int
-    col: int
+    """
+    A square on the board, identified by its row and column.
+
+    The 64 squares on the board are created once and shared: Square(row, col) and Square.at(row, col)
+    return the same instance every time, and each carries its index (row * 8 + col) for table and
+    bitboard lookups. Squares off the board can still be created, for bounds checks, but are not
+    shared and have no index: a missing index is how the engine tells that a square is off the
+    board, in place of comparing its coordinates.
+    """
+    __slots__ = ('row', 'col', 'index')
+
+    _board_squares = []
+
+    def __new__(cls, row: int, col: int):
+        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and cls._board_squares:
+            return cls._board_squares[row * BOARD_SIZE + col]
+
+        square = super().__new__(cls)
+        object.__setattr__(square, 'row', row)
+        object.__setattr__(square, 'col', col)
+        on_board = 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+        object.__setattr__(square, 'index', row * BOARD_SIZE + col if on_board else None)
+        return square
 
     @classmethod
     def at(cls, row: int, col: int):
@@ -30,3 +53,46 @@ class Square:
         """
 
         return cls(row=row, col=col)
+
+    @classmethod
+    def from_index(cls, index: int):
+        """
+        The square with the given index (row * 8 + col).
+        """
+        return cls._board_squares[index]
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self is other or (self.row == other.row and self.col == other.col)
+
+    def __hash__(self):
+        return hash((self.row, self.col))
+
+    def __repr__(self):
+        return f'Square(row={self.row}, col={self.col})'
+
+    def __reduce__(self):
+        return Square, (self.row, self.col)
+
+
+Square._board_squares = [Square(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)]
+
+
+class Undo(NamedTuple):
+    """
+    Everything needed to take back a move made with Board.make_move.
+    """
+    from_square: Square
+    to_square: Square
+    captured: Optional[object]
+    captured_moved: bool
+    moved: bool
+    player: Player
+    halfmove_clock: int
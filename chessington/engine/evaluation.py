@@ -0,0 +1,142 @@
+"""
+Static evaluation: material plus piece-square tables.
+
+Each piece is worth its material value plus a bonus or penalty for the square it stands on, taken
+from the piece-square tables of the Simplified Evaluation Function. Scores are in centipawns.
+"""
+
+from chessington.engine.data import Player
+
+# Values of each kind of piece in centipawns, in order of their kind codes
+PIECE_VALUES = (100, 320, 330, 500, 900, 0)
+
+
+def _table(ranks):
+    # Tables are written as the board is drawn, rank 8 first; square indices count from a1
+    return tuple(value for rank in reversed(ranks) for value in rank)
+
+
+# White's piece-square tables, in order of kind codes and indexed by square index
+PIECE_SQUARE_TABLES = (
+    _table([  # pawn
+        (0, 0, 0, 0, 0, 0, 0, 0),
+        (50, 50, 50, 50, 50, 50, 50, 50),
+        (10, 10, 20, 30, 30, 20, 10, 10),
+        (5, 5, 10, 25, 25, 10, 5, 5),
+        (0, 0, 0, 20, 20, 0, 0, 0),
+        (5, -5, -10, 0, 0, -10, -5, 5),
+        (5, 10, 10, -20, -20, 10, 10, 5),
+        (0, 0, 0, 0, 0, 0, 0, 0),
+    ]),
+    _table([  # knight
+        (-50, -40, -30, -30, -30, -30, -40, -50),
+        (-40, -20, 0, 0, 0, 0, -20, -40),
+        (-30, 0, 10, 15, 15, 10, 0, -30),
+        (-30, 5, 15, 20, 20, 15, 5, -30),
+        (-30, 0, 15, 20, 20, 15, 0, -30),
+        (-30, 5, 10, 15, 15, 10, 5, -30),
+        (-40, -20, 0, 5, 5, 0, -20, -40),
+        (-50, -40, -30, -30, -30, -30, -40, -50),
+    ]),
+    _table([  # bishop
+        (-20, -10, -10, -10, -10, -10, -10, -20),
+        (-10, 0, 0, 0, 0, 0, 0, -10),
+        (-10, 0, 5, 10, 10, 5, 0, -10),
+        (-10, 5, 5, 10, 10, 5, 5, -10),
+        (-10, 0, 10, 10, 10, 10, 0, -10),
+        (-10, 10, 10, 10, 10, 10, 10, -10),
+        (-10, 5, 0, 0, 0, 0, 5, -10),
+        (-20, -10, -10, -10, -10, -10, -10, -20),
+    ]),
+    _table([  # rook
+        (0, 0, 0, 0, 0, 0, 0, 0),
+        (5, 10, 10, 10, 10, 10, 10, 5),
+        (-5, 0, 0, 0, 0, 0, 0, -5),
+        (-5, 0, 0, 0, 0, 0, 0, -5),
+        (-5, 0, 0, 0, 0, 0, 0, -5),
+        (-5, 0, 0, 0, 0, 0, 0, -5),
+        (-5, 0, 0, 0, 0, 0, 0, -5),
+        (0, 0, 0, 5, 5, 0, 0, 0),
+    ]),
+    _table([  # queen
+        (-20, -10, -10, -5, -5, -10, -10, -20),
+        (-10, 0, 0, 0, 0, 0, 0, -10),
+        (-10, 0, 5, 5, 5, 5, 0, -10),
+        (-5, 0, 5, 5, 5, 5, 0, -5),
+        (0, 0, 5, 5, 5, 5, 0, -5),
+        (-10, 5, 5, 5, 5, 5, 0, -10),
+        (-10, 0, 5, 0, 0, 0, 0, -10),
+        (-20, -10, -10, -5, -5, -10, -10, -20),
+    ]),
+    _table([  # king
+        (-30, -40, -40, -50, -50, -40, -40, -30),
+        (-30, -40, -40, -50, -50, -40, -40, -30),
+        (-30, -40, -40, -50, -50, -40, -40, -30),
+        (-30, -40, -40, -50, -50, -40, -40, -30),
+        (-20, -30, -30, -40, -40, -30, -30, -20),
+        (-10, -20, -20, -20, -20, -20, -20, -10),
+        (20, 20, 0, 0, 0, 0, 20, 20),
+        (20, 30, 10, 0, 0, 10, 30, 20),
+    ]),
+)
+
+# Black's tables are White's mirrored top to bottom
+_MIRROR = 56
+
+# Each player's table bonus for a piece of each kind on each square
+PLACEMENT_VALUES = {
+    Player.WHITE: PIECE_SQUARE_TABLES,
+    Player.BLACK: tuple(tuple(table[index ^ _MIRROR] for index in range(64)) for table in PIECE_SQUARE_TABLES),
+}
+
+# The value of a piece of each player and kind on each square, material and table together
+SQUARE_VALUES = {
+    player: tuple(tuple(value + bonus for bonus in table) for value, table in zip(PIECE_VALUES, tables))
+    for player, tables in PLACEMENT_VALUES.items()
+}
+
+
+class EvalTerms:
+    """
+    Running totals of each player's material and piece-square table bonuses, kept by a board that
+    tracks them (see Board.track_eval_terms) as pieces are added to and removed from it.
+    """
+    __slots__ = ('material', 'placement')
+
+    def __init__(self):
+        self.material = {Player.WHITE: 0, Player.BLACK: 0}
+        self.placement = {Player.WHITE: 0, Player.BLACK: 0}
+
+    def score(self, player):
+        """
+        The material plus piece-square table score from the given player's point of view.
+        """
+        opponent = player.opponent()
+        return self.material[player] + self.placement[player] - self.material[opponent] - self.placement[opponent]
+
+
+def evaluate(board):
+    """
+    Material plus piece-square table score, from the point of view of the player to move, counted
+    afresh from the board's bitboards.
+    """
+    score = 0
+    for player, sign in ((Player.WHITE, 1), (Player.BLACK, -1)):
+        for kind, mask in enumerate(board.bitboards[player]):
+            values = SQUARE_VALUES[player][kind]
+            while mask:
+                lowest = mask & -mask
+                mask ^= lowest
+                score += sign * values[lowest.bit_length() - 1]
+    return score if board.current_player == Player.WHITE else -score
+
+
+def incremental_evaluate(board):
+    """
+    The same score as evaluate, read from the board's running eval_terms, which it starts tracking
+    the first time it is asked.
+    """
+    terms = board.eval_terms
+    if terms is None:
+        terms = board.track_eval_terms()
+    return terms.score(board.current_player)
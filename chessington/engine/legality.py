@@ -0,0 +1,154 @@
+"""
+Legality filtering for move generation.
+
+Rather than playing each candidate move and testing whether the mover's king is left in check, the
+position is analysed once per side to move: which enemy pieces give check, which squares would
+block or capture a single checker, and which friendly pieces are pinned to their king and along
+which line. A pseudo-legal move is then legal exactly when its destination lies in the resulting
+bitmask.
+"""
+
+from chessington.engine import attacks, pieces
+
+FULL_MASK = (1 << 64) - 1
+
+
+def _bit_indices(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def attacked_squares(board, player, ignored=0):
+    """
+    The mask of squares attacked by the given player's pieces, treating the squares in `ignored`
+    as empty so that attacks pass through them.
+    """
+    occupied = board.occupied & ~ignored
+    attacked = 0
+
+    for index in _bit_indices(board.piece_mask(player, pieces.Pawn)):
+        attacked |= attacks.PAWN_ATTACK_MASKS[player][index]
+    for index in _bit_indices(board.piece_mask(player, pieces.Knight)):
+        attacked |= attacks.KNIGHT_MASKS[index]
+    for index in _bit_indices(board.piece_mask(player, pieces.King)):
+        attacked |= attacks.KING_MASKS[index]
+
+    queens = board.piece_mask(player, pieces.Queen)
+    sliders = [
+        (board.piece_mask(player, pieces.Rook) | queens, attacks.LATERAL_RAYS),
+        (board.piece_mask(player, pieces.Bishop) | queens, attacks.DIAGONAL_RAYS),
+    ]
+    for mask, ray_table in sliders:
+        for index in _bit_indices(mask):
+            for ray in ray_table[index]:
+                for square in ray:
+                    bit = 1 << square.index
+                    attacked |= bit
+                    if bit & occupied:
+                        break
+
+    return attacked
+
+
+class CheckInfo:
+    """
+    The checks against, and pins on, one player's king in a single position.
+
+    block_mask holds the squares a non-king move must land on to deal with any check (every square
+    when not in check, none in double check), and pins maps the square index of each pinned piece
+    to the squares along its pin line.
+    """
+
+    def __init__(self, board, player):
+        self._board = board
+        self._player = player
+        self._king_danger = None
+        self.king_index = None
+        self.checkers = 0
+        self.block_mask = FULL_MASK
+        self.pins = {}
+
+        king_mask = board.piece_mask(player, pieces.King)
+        if king_mask:
+            self.king_index = (king_mask & -king_mask).bit_length() - 1
+            self._find_checks_and_pins()
+
+    def _find_checks_and_pins(self):
+        board, player, king_index = self._board, self._player, self.king_index
+        opponent = player.opponent()
+
+        checkers = (attacks.PAWN_ATTACK_MASKS[player][king_index] & board.piece_mask(opponent, pieces.Pawn)) | \
+                   (attacks.KNIGHT_MASKS[king_index] & board.piece_mask(opponent, pieces.Knight)) | \
+                   (attacks.KING_MASKS[king_index] & board.piece_mask(opponent, pieces.King))
+        block_mask = checkers
+
+        own = board.occupancy[player]
+        occupied = board.occupied
+        queens = board.piece_mask(opponent, pieces.Queen)
+        sliders = [
+            (board.piece_mask(opponent, pieces.Rook) | queens, attacks.LATERAL_RAYS[king_index]),
+            (board.piece_mask(opponent, pieces.Bishop) | queens, attacks.DIAGONAL_RAYS[king_index]),
+        ]
+        for slider_mask, rays in sliders:
+            for ray in rays:
+                line = 0
+                pinned = None
+                for square in ray:
+                    index = square.index
+                    bit = 1 << index
+                    line |= bit
+                    if not bit & occupied:
+                        continue
+                    if bit & slider_mask:
+                        if pinned is None:
+                            checkers |= bit
+                            block_mask |= line
+                        else:
+                            self.pins[pinned] = line
+                        break
+                    if pinned is None and bit & own:
+                        pinned = index
+                        continue
+                    break
+
+        self.checkers = checkers
+        if not checkers:
+            self.block_mask = FULL_MASK
+        elif checkers & (checkers - 1):
+            self.block_mask = 0  # double check, only the king may move
+        else:
+            self.block_mask = block_mask
+
+    @property
+    def king_danger(self):
+        """
+        The squares the king may not step onto, computed with the king lifted off the board so that
+        it cannot shelter behind itself from a sliding attack.
+        """
+        if self._king_danger is None:
+            king_bit = 0 if self.king_index is None else 1 << self.king_index
+            self._king_danger = attacked_squares(self._board, self._player.opponent(), king_bit)
+        return self._king_danger
+
+    def legal_targets(self, square):
+        """
+        The mask of squares a non-king piece standing on the given square may move to.
+        """
+        return self.block_mask & self.pins.get(square.index, FULL_MASK)
+
+
+def check_info(board, player):
+    """
+    The CheckInfo for the given player's king, reusing the last one computed for this board while the
+    position is unchanged.
+    """
+    key = (board.zobrist, player)
+    cached = board.check_info_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    info = CheckInfo(board, player)
+    board.check_info_cache = (key, info)
+    return info
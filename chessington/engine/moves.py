@@ -0,0 +1,105 @@
+"""
+A compact integer encoding of moves.
+
+A move is packed into 16 bits: the square index (row * 8 + col) it starts from in bits 0-5, the
+square index it ends on in bits 6-11 and flags in bits 12-15. Encoded moves fit in an array('H'),
+which takes two bytes per move.
+
+The flags are CAPTURE, DOUBLE_PAWN_PUSH, CASTLE and PROMOTION. The engine's own move generators never
+castle, capture en passant or promote, but moves read from games do, so:
+
+* a castling move is the king's move, flagged CASTLE;
+* an en passant capture is flagged EN_PASSANT, which is CAPTURE | DOUBLE_PAWN_PUSH (a combination no
+  other move can have);
+* a promotion is flagged PROMOTION, possibly with CAPTURE, and holds the kind code of the piece
+  promoted to, less one, in the two bits otherwise used by DOUBLE_PAWN_PUSH and CASTLE.
+"""
+
+from chessington.engine.data import Square
+
+CAPTURE = 1
+DOUBLE_PAWN_PUSH = 2
+CASTLE = 4
+PROMOTION = 8
+EN_PASSANT = CAPTURE | DOUBLE_PAWN_PUSH
+
+_SQUARE_BITS = 6
+_SQUARE_MASK = (1 << _SQUARE_BITS) - 1
+
+
+def encode_move(from_square: Square, to_square: Square, flags: int = 0) -> int:
+    """
+    Packs a move between the two squares into a 16-bit integer.
+    """
+    return from_square.index | (to_square.index << _SQUARE_BITS) | (flags << (2 * _SQUARE_BITS))
+
+
+def move_from_index(move: int) -> int:
+    return move & _SQUARE_MASK
+
+
+def move_to_index(move: int) -> int:
+    return (move >> _SQUARE_BITS) & _SQUARE_MASK
+
+
+def move_flags(move: int) -> int:
+    return move >> (2 * _SQUARE_BITS)
+
+
+def promotion_flags(kind: int) -> int:
+    """
+    The flags for a promotion to a piece of the given kind (knight to queen).
+    """
+    return PROMOTION | ((kind - 1) << 1)
+
+
+def promotion_kind(move: int):
+    """
+    The kind code of the piece a move promotes to, or None if it is not a promotion.
+    """
+    flags = move_flags(move)
+    if not flags & PROMOTION:
+        return None
+    return ((flags >> 1) & 3) + 1
+
+
+def decode_move(move: int):
+    """
+    Unpacks an encoded move into its (from_square, to_square) pair.
+    """
+    return Square.from_index(move_from_index(move)), Square.from_index(move_to_index(move))
+
+
+FILES = 'abcdefgh'
+
+
+def square_name(square: Square) -> str:
+    """
+    The algebraic name of a square, such as "e4".
+    """
+    return f'{FILES[square.col]}{square.row + 1}'
+
+
+def parse_square(name: str) -> Square:
+    """
+    The square with the given algebraic name, such as "e4".
+    """
+    if len(name) != 2 or name[0] not in FILES or name[1] not in '12345678':
+        raise ValueError(f'Not a square: {name!r}')
+    return Square.at(int(name[1]) - 1, FILES.index(name[0]))
+
+
+def move_to_text(move: int) -> str:
+    """
+    An encoded move in coordinate notation, such as "e2e4".
+    """
+    from_square, to_square = decode_move(move)
+    kind = promotion_kind(move)
+    return square_name(from_square) + square_name(to_square) + ('' if kind is None else 'pnbrqk'[kind])
+
+
+def parse_move(text: str):
+    """
+    The (from_square, to_square) pair for a move in coordinate notation, such as "e2e4".
+    """
+    return parse_square(text[:2]), parse_square(text[2:])
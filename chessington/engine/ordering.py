@@ -0,0 +1,120 @@
+"""
+Move ordering for search.
+
+Alpha-beta prunes most when the best move is searched first, so moves are sorted before they are
+searched:
+
+1. the hash move, normally the best move found by the previous iteration;
+2. captures, most valuable victim first and then least valuable attacker first (MVV-LVA);
+3. killer moves, quiet moves that caused a cutoff at the same ply elsewhere in the tree;
+4. other quiet moves, by their butterfly history score, which grows each time the move (by its from
+   and to squares) causes a cutoff anywhere in the tree.
+
+Each move's score is packed with the move itself into a single integer, so sorting compares plain
+integers rather than calling a key function or comparing tuples.
+"""
+
+from array import array
+
+from chessington.engine.moves import CAPTURE
+
+# The layout of encoded moves (see the moves module), unpacked inline here for speed
+_MOVE_BITS = 16
+_MOVE_MASK = (1 << _MOVE_BITS) - 1
+_SQUARE_MASK = 63
+_TO_SHIFT = 6
+_FLAGS_SHIFT = 12
+_FROM_TO_MASK = (1 << _FLAGS_SHIFT) - 1  # the from and to squares of an encoded move
+
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+KILLER_SCORE = 1 << 27
+HISTORY_LIMIT = 1 << 26  # history scores are halved when one passes this, keeping them below killers
+
+KILLERS_PER_PLY = 2
+
+
+def mvv_lva(victim_kind, attacker_kind):
+    """
+    The ordering score of a capture: higher for more valuable victims and, among captures of the same
+    victim, for less valuable attackers. Kind codes run from pawn to king in order of value.
+    """
+    return (victim_kind + 1) * 8 - attacker_kind
+
+
+class MoveOrderer:
+    """
+    Sorts moves for search, keeping the killer moves and history table it learns from the cutoffs
+    reported to it with record_cutoff.
+    """
+
+    def __init__(self, max_ply=64):
+        self.killers = [[None] * KILLERS_PER_PLY for _ in range(max_ply + 1)]
+        self.history = array('l', bytes(array('l').itemsize * (_FROM_TO_MASK + 1)))
+        self._keys = []
+
+    def order(self, board, moves, ply, hash_move=None):
+        """
+        Sorts the array of encoded moves in place, best candidates first.
+        """
+        board_state = board.board
+        killers = self.killers[ply]
+        history = self.history
+        keys = self._keys
+        del keys[:]
+
+        for move in moves:
+            if move == hash_move:
+                score = HASH_MOVE_SCORE
+            elif (move >> _FLAGS_SHIFT) & CAPTURE:
+                to_index = (move >> _TO_SHIFT) & _SQUARE_MASK
+                from_index = move & _SQUARE_MASK
+                victim = board_state[to_index >> 3][to_index & 7]
+                attacker = board_state[from_index >> 3][from_index & 7]
+                score = CAPTURE_SCORE + mvv_lva(victim.kind, attacker.kind)
+            elif move == killers[0]:
+                score = KILLER_SCORE + 1
+            elif move == killers[1]:
+                score = KILLER_SCORE
+            else:
+                score = history[move & _FROM_TO_MASK]
+            keys.append((score << _MOVE_BITS) | move)
+
+        keys.sort(reverse=True)
+        for index, key in enumerate(keys):
+            moves[index] = key & _MOVE_MASK
+        return moves
+
+    def record_cutoff(self, move, ply, depth):
+        """
+        Learns from a move that caused a beta cutoff at the given ply with the given remaining depth.
+        Captures are already ordered well, so only quiet moves are recorded.
+        """
+        if (move >> _FLAGS_SHIFT) & CAPTURE:
+            return
+
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        index = move & _FROM_TO_MASK
+        self.history[index] += depth * depth
+        if self.history[index] > HISTORY_LIMIT:
+            self.age_history()
+
+    def age_history(self):
+        """
+        Halves every history score, so that old cutoffs count for less than new ones.
+        """
+        history = self.history
+        for index in range(len(history)):
+            history[index] >>= 1
+
+    def new_search(self):
+        """
+        Forgets the killer moves, which belong to the positions of one search, and ages the history.
+        """
+        for killers in self.killers:
+            killers[:] = [None] * KILLERS_PER_PLY
+        self.age_history()
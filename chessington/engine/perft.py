@@ -0,0 +1,128 @@
+"""
+Performance test ("perft") for the move generator: counts the leaf nodes of the legal move tree
+to a fixed depth. The counts check the generator's correctness and the timing measures its speed.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chessington.engine.binary import encode_position, decode_position
+from chessington.engine.board import Board
+from chessington.engine.moves import decode_move, move_to_text, parse_move
+
+
+def perft(board, depth):
+    """
+    Counts the positions reached after exactly `depth` moves from the given position.
+    """
+    if depth == 0:
+        return 1
+
+    moves = board.legal_moves()
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        board.make_move(*decode_move(move))
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Splits the perft count by root move, returning (move, nodes) pairs in move generation order.
+    """
+    counts = []
+    for move in board.legal_moves():
+        board.make_move(*decode_move(move))
+        counts.append((move, perft(board, depth - 1)))
+        board.unmake_move()
+    return counts
+
+
+def _perft_task(task):
+    packed, moves, depth = task
+    board = decode_position(packed)
+    for move in moves:
+        board.make_move(*decode_move(move))
+    return perft(board, depth)
+
+
+def parallel_divide(board, depth, workers=None):
+    """
+    As divide, but shares the work between a pool of worker processes. Each worker is sent the position
+    in its binary encoding and the moves leading to its subtree. The tree is split at the root, or below each root
+    move when there are too few root moves to keep every worker busy.
+    """
+    workers = workers or os.cpu_count()
+    packed = encode_position(board)
+    root_moves = list(board.legal_moves())
+
+    split_below_root = depth >= 3 and len(root_moves) < 4 * workers
+    tasks = []
+    for move in root_moves:
+        if split_below_root:
+            board.make_move(*decode_move(move))
+            tasks.extend((packed, (move, reply), depth - 2) for reply in board.legal_moves())
+            board.unmake_move()
+        else:
+            tasks.append((packed, (move,), depth - 1))
+
+    counts = dict.fromkeys(root_moves, 0)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * workers))
+        for (_, moves, _), nodes in zip(tasks, executor.map(_perft_task, tasks, chunksize=chunksize)):
+            counts[moves[0]] += nodes
+    return list(counts.items())
+
+
+def play_moves(board, moves):
+    """
+    Plays a sequence of moves given in coordinate notation (such as "e2e4") on the board.
+    """
+    for text in moves:
+        from_square, to_square = parse_move(text)
+        if board.get_piece(from_square) is None:
+            raise ValueError(f'There is no piece to move for {text}')
+        board.make_move(from_square, to_square)
+    return board
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description='Count and time the legal move tree to a given depth.')
+    parser.add_argument('depth', type=int, help='number of plies to search')
+    parser.add_argument('--fen', help='the position to start from, in FEN (default: the starting position)')
+    parser.add_argument('--moves', nargs='*', default=[],
+                        help='moves in coordinate notation (e.g. e2e4) played from that position first')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes, or 0 for one per CPU (default: 1, no pool)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run perft from the command line, printing the divide counts, total nodes and speed"""
+    args = _parse_args(argv)
+    if args.depth < 1:
+        raise SystemExit('The depth must be at least 1')
+
+    board = Board.from_fen(args.fen) if args.fen else Board.at_starting_position()
+    board = play_moves(board, args.moves)
+
+    start = time.perf_counter()
+    if args.workers == 1:
+        counts = divide(board, args.depth)
+    else:
+        counts = parallel_divide(board, args.depth, args.workers or None)
+    elapsed = time.perf_counter() - start
+
+    for move, nodes in counts:
+        print(f'{move_to_text(move)}: {nodes}')
+    total = sum(nodes for _, nodes in counts)
+    print()
+    print(f'Nodes searched: {total}')
+    print(f'Time: {elapsed:.3f}s')
+    print(f'Nodes per second: {int(total / elapsed) if elapsed > 0 else 0}')
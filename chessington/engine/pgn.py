@@ -0,0 +1,367 @@
+"""
+Reading games in Portable Game Notation.
+
+Archives are read a line at a time and each move is played as soon as it is read, so memory use does
+not grow with the size of the archive or of a game. Moves in Standard Algebraic Notation ("Nbd2",
+"exd6", "e8=Q+", "O-O") are resolved against the board with the pieces' own move generators, looking
+only at the pieces of the kind that moves.
+
+The board has no notion of castling, en passant or promotion, so GameReplay applies those rules itself
+on top of Board.move_piece.
+"""
+
+import re
+
+from chessington.engine import attacks, legality
+from chessington.engine.board import Board, PIECE_TYPES, FEN_LETTERS, FEN_PIECES, HOME_ROWS, KING_COL, BOARD_SIZE, square_bit
+from chessington.engine.data import Square
+from chessington.engine.moves import encode_move, decode_move, move_flags, promotion_flags, promotion_kind, \
+    parse_square, square_name, FILES, CAPTURE, DOUBLE_PAWN_PUSH, CASTLE, PROMOTION, EN_PASSANT
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PAWN, ROOK, KING
+
+RESULTS = frozenset(['1-0', '0-1', '1/2-1/2', '*'])
+
+# Kinds of event produced by the tokenizer
+HEADER, MOVE, RESULT, MALFORMED = range(4)
+
+_HEADER = re.compile(r'\[\s*(\w+)\s*"((?:[^"\\]|\\.)*)"\s*\]\s*')
+_TOKEN = re.compile(r'[{};()]|\$\d+|[^\s{};()]+')
+_MOVE_NUMBER = re.compile(r'\d+\.+')
+_SAN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?')
+
+_KINGSIDE = ('O-O', '0-0')
+_QUEENSIDE = ('O-O-O', '0-0-0')
+_ROOK_COLS = {_KINGSIDE: BOARD_SIZE - 1, _QUEENSIDE: 0}
+
+
+class PgnError(ValueError):
+    """
+    A game that cannot be read or replayed.
+    """
+
+
+def tokenize(lines):
+    """
+    Splits PGN text into (event, value) pairs: (HEADER, (name, value)) for each tag pair, (MOVE, san)
+    for each move of the main line and (RESULT, token) for each game termination marker. Comments,
+    variations, numeric annotation glyphs and move numbers are dropped, and a line that cannot be
+    read produces (MALFORMED, line).
+    """
+    in_comment = False
+    variation_depth = 0
+    for line in lines:
+        if line.startswith('%'):
+            continue  # escaped line
+        if not in_comment and variation_depth == 0 and line.lstrip().startswith('['):
+            stripped = line.strip()
+            match = _HEADER.fullmatch(stripped)
+            if match is None:
+                yield MALFORMED, stripped
+            else:
+                yield HEADER, (match.group(1), match.group(2).replace('\\"', '"').replace('\\\\', '\\'))
+            continue
+
+        for match in _TOKEN.finditer(line):
+            token = match.group()
+            if in_comment:
+                in_comment = token != '}'
+            elif token == '{':
+                in_comment = True
+            elif token == ';':
+                break  # comment to the end of the line
+            elif token == '(':
+                variation_depth += 1
+            elif token == ')':
+                variation_depth = max(variation_depth - 1, 0)
+            elif variation_depth or token.startswith('$'):
+                continue
+            elif token in RESULTS:
+                yield RESULT, token
+            else:
+                san = token[_MOVE_NUMBER.match(token).end():] if _MOVE_NUMBER.match(token) else token
+                if san:
+                    yield MOVE, san
+
+
+class GameReplay:
+    """
+    Plays a game's moves on a board, including castling, en passant and promotion.
+    """
+
+    def __init__(self, board, en_passant=None):
+        self.board = board
+        self.en_passant = en_passant  # the square a pawn may capture onto en passant, if any
+
+    @staticmethod
+    def from_headers(headers, flyweight=False):
+        """
+        A replay starting from the position in the game's FEN tag, or from the starting position if it
+        has none.
+        """
+        fen = headers.get('FEN')
+        if fen is None:
+            return GameReplay(Board.at_starting_position(flyweight))
+        try:
+            board = Board.from_fen(fen, flyweight)
+            fields = fen.split()
+            en_passant = parse_square(fields[3]) if len(fields) > 3 and fields[3] != '-' else None
+        except ValueError as error:
+            raise PgnError(f'Invalid FEN tag: {fen!r}') from error
+        return GameReplay(board, en_passant)
+
+    def resolve(self, san):
+        """
+        The encoded move (see the moves module) for a legal move in Standard Algebraic Notation.
+        """
+        text = san.rstrip('+#!?')
+        for notations, rook_col in _ROOK_COLS.items():
+            if text in notations:
+                return self._castling_move(rook_col, san)
+
+        match = _SAN.fullmatch(text)
+        if match is None:
+            raise PgnError(f'Not a move: {san!r}')
+        letter, file, rank, target, promotion = match.groups()
+        piece_type = FEN_PIECES[letter.lower()] if letter else Pawn
+        to_square = parse_square(target)
+        board = self.board
+
+        if piece_type is Pawn:
+            last_row = HOME_ROWS[board.current_player.opponent()]
+            if (promotion is not None) != (to_square.row == last_row):
+                raise PgnError(f'Not a move: {san!r}')
+            if file is None:
+                file = target[0]
+        elif promotion is not None:
+            raise PgnError(f'Not a move: {san!r}')
+
+        candidates = []
+        mask = board.piece_mask(board.current_player, piece_type)
+        while mask:
+            lowest = mask & -mask
+            mask ^= lowest
+            from_square = Square.from_index(lowest.bit_length() - 1)
+            if (file is not None and FILES[from_square.col] != file) or \
+                    (rank is not None and from_square.row != int(rank) - 1):
+                continue
+            piece = board.board[from_square.row][from_square.col]
+            if to_square in piece.get_available_moves_from(board, from_square):
+                flags = CAPTURE if board.get_piece(to_square) is not None else 0
+                if piece_type is Pawn and abs(to_square.row - from_square.row) == 2:
+                    flags |= DOUBLE_PAWN_PUSH
+                candidates.append(encode_move(from_square, to_square, flags))
+            elif piece_type is Pawn and to_square == self.en_passant and \
+                    to_square in attacks.PAWN_ATTACKS[piece.player][from_square.index] and \
+                    self._en_passant_is_legal(from_square, to_square):
+                candidates.append(encode_move(from_square, to_square, EN_PASSANT))
+
+        if len(candidates) != 1:
+            raise PgnError(f'{"Ambiguous" if candidates else "Illegal"} move: {san!r}')
+        move = candidates[0]
+        if promotion is not None:
+            move = encode_move(*decode_move(move), promotion_flags(FEN_PIECES[promotion.lower()].kind) |
+                               (move_flags(move) & CAPTURE))
+        return move
+
+    def validate(self, move):
+        """
+        The encoded move, with its flags worked out afresh, if it is legal. Castling is recognised as a
+        king moving two squares from its starting square, whatever the move's flags.
+        """
+        from_square, to_square = decode_move(move)
+        piece = self.board.get_piece(from_square)
+        if piece is None:
+            raise PgnError(f'Illegal move: no piece on {square_name(from_square)}')
+        if piece.kind == KING and from_square.col == KING_COL and to_square.row == from_square.row and \
+                abs(to_square.col - from_square.col) == 2:
+            castling = self.resolve('O-O' if to_square.col > from_square.col else 'O-O-O')
+            if decode_move(castling) != (from_square, to_square):
+                raise PgnError(f'Illegal move: {square_name(from_square)}{square_name(to_square)}')
+            return castling
+
+        kind = promotion_kind(move)
+        return self.resolve(('' if piece.kind == PAWN else FEN_LETTERS[piece.kind].upper()) +
+                            square_name(from_square) + square_name(to_square) +
+                            ('' if kind is None else '=' + FEN_LETTERS[kind].upper()))
+
+    def _castling_move(self, rook_col, san):
+        board = self.board
+        player = board.current_player
+        row = HOME_ROWS[player]
+        king_square = Square.at(row, KING_COL)
+        rook_square = Square.at(row, rook_col)
+        king = board.get_piece(king_square)
+        rook = board.get_piece(rook_square)
+        if king is None or king.kind != KING or king.player != player or board.has_moved(king_square) or \
+                rook is None or rook.kind != ROOK or rook.player != player or board.has_moved(rook_square):
+            raise PgnError(f'Illegal move: {san!r}')
+
+        step = 1 if rook_col > KING_COL else -1
+        between = range(min(KING_COL, rook_col) + 1, max(KING_COL, rook_col))
+        if any(board.board[row][col] is not None for col in between):
+            raise PgnError(f'Illegal move: {san!r}')
+        attacked = legality.attacked_squares(board, player.opponent())
+        if any(attacked & square_bit(Square.at(row, KING_COL + step * distance)) for distance in range(3)):
+            raise PgnError(f'Illegal move: {san!r}')
+        return encode_move(king_square, Square.at(row, KING_COL + 2 * step), CASTLE)
+
+    def _en_passant_is_legal(self, from_square, to_square):
+        # Whether capturing en passant leaves the mover's king safe. The capture empties two squares at
+        # once, which the pin analysis cannot see, so the king's attackers are looked for afresh.
+        board = self.board
+        player = board.current_player
+        opponent = player.opponent()
+        king_mask = board.piece_mask(player, King)
+        if not king_mask:
+            return True
+        king_index = king_mask.bit_length() - 1
+        captured_bit = square_bit(Square.at(from_square.row, to_square.col))
+        occupied = (board.occupied & ~square_bit(from_square) & ~captured_bit) | square_bit(to_square)
+
+        if attacks.PAWN_ATTACK_MASKS[player][king_index] & board.piece_mask(opponent, Pawn) & ~captured_bit or \
+                attacks.KNIGHT_MASKS[king_index] & board.piece_mask(opponent, Knight) or \
+                attacks.KING_MASKS[king_index] & board.piece_mask(opponent, King):
+            return False
+
+        queens = board.piece_mask(opponent, Queen)
+        sliders = [
+            (board.piece_mask(opponent, Rook) | queens, attacks.LATERAL_RAYS[king_index]),
+            (board.piece_mask(opponent, Bishop) | queens, attacks.DIAGONAL_RAYS[king_index]),
+        ]
+        for slider_mask, rays in sliders:
+            for ray in rays:
+                for square in ray:
+                    bit = square_bit(square)
+                    if bit & occupied:
+                        if bit & slider_mask and square != to_square:
+                            return False
+                        break
+        return True
+
+    def play(self, move):
+        """
+        Plays an encoded move, as returned by resolve, on the board.
+        """
+        board = self.board
+        from_square, to_square = decode_move(move)
+        flags = move_flags(move)
+        self.en_passant = None
+
+        if flags & PROMOTION:
+            pawn = board.get_piece(from_square)
+            board.move_piece(from_square, to_square)
+            piece_type = PIECE_TYPES[promotion_kind(move)]
+            board.place_moved_piece(to_square, piece_type.shared(pawn.player) if board.flyweight
+                                    else piece_type(pawn.player))
+        elif flags & EN_PASSANT == EN_PASSANT:
+            board.set_piece(Square.at(from_square.row, to_square.col), None)
+            board.move_piece(from_square, to_square)
+        elif flags & CASTLE:
+            board.move_piece(from_square, to_square)
+            row = from_square.row
+            rook_square = Square.at(row, BOARD_SIZE - 1 if to_square.col > from_square.col else 0)
+            rook = board.get_piece(rook_square)
+            board.set_piece(rook_square, None)
+            board.place_moved_piece(Square.at(row, (from_square.col + to_square.col) // 2), rook)
+        else:
+            board.move_piece(from_square, to_square)
+            if flags & DOUBLE_PAWN_PUSH:
+                self.en_passant = Square.at((from_square.row + to_square.row) // 2, from_square.col)
+
+
+def read_games(lines):
+    """
+    Splits PGN text into games without replaying them, yielding a (headers, moves, result, error) tuple
+    for each: the tag pairs, the moves of the main line in SAN, the result token (None if the game
+    has none) and a description of the first line that could not be read (None if there was none).
+    """
+    headers, moves, error = {}, [], None
+    for event, value in tokenize(lines):
+        if event == HEADER and moves or event == RESULT:
+            yield headers, moves, value if event == RESULT else None, error
+            headers, moves, error = {}, [], None
+            if event == RESULT:
+                continue
+
+        if event == HEADER:
+            headers[value[0]] = value[1]
+        elif event == MALFORMED:
+            error = error or f'Malformed line: {value!r}'
+        else:
+            moves.append(value)
+
+    if headers or moves or error:
+        yield headers, moves, None, error
+
+
+class PgnReader:
+    """
+    Streams the moves of every game in a PGN archive.
+
+    Iterating yields a (headers, board, move) tuple for each move: the game's tag pairs, the board as it
+    stands before the move and the encoded move. The board is the one the game is being played on, and
+    changes once the next tuple is asked for, so anything kept from it should be copied (to_fen, or
+    binary.encode_position).
+
+    A game whose tags or moves cannot be read is skipped from that point on and counted in
+    games_skipped, or raises PgnError if skip_malformed is false. Moves yielded before the bad one are
+    not taken back.
+    """
+
+    def __init__(self, lines, skip_malformed=True, flyweight=False):
+        self.lines = lines
+        self.skip_malformed = skip_malformed
+        self.flyweight = flyweight
+        self.games_read = 0
+        self.games_skipped = 0
+        self.moves_read = 0
+        self.last_error = None
+
+    def __iter__(self):
+        headers = {}
+        replay = None
+        in_movetext = False
+        skipping = False
+
+        for event, value in tokenize(self.lines):
+            if event == HEADER and in_movetext or event == RESULT:
+                # A tag pair after moves starts a new game, even if the last one had no result
+                if not skipping:
+                    self.games_read += 1
+                headers, replay, in_movetext, skipping = {}, None, False, False
+                if event == RESULT:
+                    continue
+
+            if event == MOVE:
+                in_movetext = True
+            if skipping:
+                continue
+            try:
+                if event == HEADER:
+                    headers[value[0]] = value[1]
+                elif event == MALFORMED:
+                    raise PgnError(f'Malformed line: {value!r}')
+                else:
+                    if replay is None:
+                        replay = GameReplay.from_headers(headers, self.flyweight)
+                    move = replay.resolve(value)
+                    yield headers, replay.board, move
+                    replay.play(move)
+                    self.moves_read += 1
+            except PgnError as error:
+                self.last_error = error
+                if not self.skip_malformed:
+                    raise
+                self.games_skipped += 1
+                skipping = True
+
+        if (in_movetext or headers) and not skipping:
+            self.games_read += 1
+
+
+def read_pgn(path, skip_malformed=True, flyweight=False):
+    """
+    Streams (headers, board, move) tuples for every move of every game in a PGN file, as PgnReader.
+    """
+    with open(path, encoding='utf-8', errors='replace') as lines:
+        yield from PgnReader(lines, skip_malformed, flyweight)
@@ -4,180 +4,165 @@ Definitions of each of the different chess pieces.
 
 from abc import ABC, abstractmethod
 
-from chessington.engine.data import Player, Square
+from chessington.engine import attacks, legality
 
-import copy
-
-BOARD_MAX = 7
-BOARD_MIN = 0
+# Integer codes for each kind of piece, used to index bitboards and tables
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
 
 
 class Piece(ABC):
 
     """
     An abstract base class from which all pieces inherit.
+
+    Pieces normally carry their own moved flag. Piece types can also hand out a single shared
+    instance per colour with shared(); a board built from those keeps the moved state itself.
     """
+    __slots__ = ('player', 'moved')
+
+    kind = None
+    _shared = {}
 
     def __init__(self, player):
         self.player = player
         self.moved = False
 
+    @classmethod
+    def shared(cls, player):
+        """
+        The flyweight instance of this piece type for the given player.
+        """
+        piece = Piece._shared.get((cls, player))
+        if piece is None:
+            piece = Piece._shared[(cls, player)] = cls(player)
+        return piece
+
     def maybe_add_square(self, squarelist, square, board, empty, takeable):
-        if BOARD_MIN <= square.row <= BOARD_MAX and BOARD_MIN <= square.col <= BOARD_MAX:
-            piece = board.get_piece(square)
-            if not self._is_illegal_move(board, square):
-                if piece is None:
-                    if empty:
-                        squarelist.append(square)
-                        return False  # empty square is not obstruction
-
-                else:
-                    if piece.player != self.player:
-                        if takeable:
-                            if not isinstance(piece, King):
-                                squarelist.append(square)
-                    return True  # any colour is obstruction
+        """
+        Adds the square to the list if the piece may legally move there, and reports whether the
+        square blocks any further movement in the same direction.
+        """
+        if square.index is not None:
+            legal_targets = self._legal_targets(board, board.find_piece(self))
+            return self._add_square(squarelist, square, board, empty, takeable, legal_targets)
         else:
             return True  # walls of board are also obstructions
 
+    def _add_square(self, squarelist, square, board, empty, takeable, legal_targets):
+        """
+        As maybe_add_square, for a square already known to be on the board and with the mask of
+        squares this piece may legally move to already worked out.
+        """
+        piece = board.get_piece(square)
+        if piece is None:
+            if empty and (1 << square.index) & legal_targets:
+                squarelist.append(square)
+            return False  # empty square is not obstruction
+
+        if piece.player != self.player and takeable and piece.kind != KING:
+            if (1 << square.index) & legal_targets:
+                squarelist.append(square)
+        return True  # any colour is obstruction
+
+    def _legal_targets(self, board, pos):
+        """
+        The mask of squares this piece, standing on pos, could move to without leaving its own king
+        in check.
+        """
+        return legality.check_info(board, self.player).legal_targets(pos)
+
     def _is_illegal_move(self, board, square) -> bool:
         # check if self moves to square will the king be in check
-        # current_piece = board.get_piece(self)
-        board_temp = copy.copy(board)
-        king_piece = board_temp.get_king(self.player)
-        self.move_to(board_temp, square)
-        if king_piece is None:
-            return False
-        return king_piece.is_in_check(board_temp)
-
+        return not (1 << square.index) & self._legal_targets(board, board.find_piece(self))
 
     def is_in_check(self, board, square=None) -> bool:
         pos = board.find_piece(self) if square is None else square
 
         if not self._checked_by_pawn(board, pos):
             if not self._checked_by_knight(board, pos):
-                if not self._checked_by_lateral(board, pos):
-                    if not self._checked_by_diagonal(board, pos):
-                        return False
+                if not self._checked_by_king(board, pos):
+                    if not self._checked_by_lateral(board, pos):
+                        if not self._checked_by_diagonal(board, pos):
+                            return False
         return True
 
     def get_diagonal(self, squarelist, square, board, is_king=False):
-        direction = [(True, True), (False, True), (False, False), (True, False)]
-
-        for d in direction:
-            next_col = square.col + 1 if d[1] else square.col - 1
-            next_row_init = square.row + 1 if d[0] else square.row - 1
-            next_row_end = BOARD_MAX + 1 if d[0] else BOARD_MIN - 1
-            step = 1 if d[0] else -1
-
-            for next_row in range(next_row_init, next_row_end, step):
-                obstruction = self.maybe_add_square(
+        legal_targets = self._legal_targets(board, square)
+        for ray in attacks.DIAGONAL_RAYS[square.index]:
+            for next_square in ray:
+                obstruction = self._add_square(
                     squarelist=squarelist,
-                    square=Square.at(next_row, next_col),
+                    square=next_square,
                     board=board,
                     empty=True,
-                    takeable=True)
+                    takeable=True,
+                    legal_targets=legal_targets)
 
                 if obstruction or is_king:
                     break
 
-                next_col = next_col + 1 if d[1] else next_col - 1
-
     def get_lateral(self, squarelist, square, board, is_king=False):
-        config = [
-            (square.row + 1, BOARD_MAX + 1, 1, True),
-            (square.row - 1, BOARD_MIN - 1, -1, True),
-            (square.col + 1, BOARD_MAX + 1, 1, False),
-            (square.col - 1, BOARD_MIN - 1, -1, False)
-        ]
-
-        for c in config:
-            for n in range(c[0], c[1], c[2]):
-                obstruction = self.maybe_add_square(
+        legal_targets = self._legal_targets(board, square)
+        for ray in attacks.LATERAL_RAYS[square.index]:
+            for next_square in ray:
+                obstruction = self._add_square(
                     squarelist=squarelist,
-                    square=Square.at(n, square.col) if c[3] else Square.at(square.row, n),
+                    square=next_square,
                     board=board,
                     empty=True,
-                    takeable=True)
+                    takeable=True,
+                    legal_targets=legal_targets)
 
                 if obstruction or is_king:
                     break
 
     def _checked_by_pawn(self, board, pos) -> bool:
-        white = self.player == Player.WHITE
-        pawn_left = board.get_piece(Square.at(pos.row + 1 if white else pos.row - 1, pos.col - 1))
-        pawn_right = board.get_piece(Square.at(pos.row + 1 if white else pos.row - 1, pos.col + 1))
-
-        return (isinstance(pawn_left, Pawn) and pawn_left.player is not self.player) or \
-               (isinstance(pawn_right, Pawn) and pawn_right.player is not self.player)
+        # an enemy pawn attacks pos from the squares a friendly pawn on pos would attack
+        return bool(attacks.PAWN_ATTACK_MASKS[self.player][pos.index] &
+                    board.piece_mask(self.player.opponent(), Pawn))
 
     def _checked_by_knight(self, board, pos) -> bool:
-        config = [
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-        ]
-
-        for row_offset, col_offset in config:
-            curr_knight = board.get_piece(Square.at(pos.row + row_offset, pos.col + col_offset))
-
-            if isinstance(curr_knight, Knight) and curr_knight.player is not self.player:
-                return True
+        return bool(attacks.KNIGHT_MASKS[pos.index] & board.piece_mask(self.player.opponent(), Knight))
 
-        return False
+    def _checked_by_king(self, board, pos) -> bool:
+        return bool(attacks.KING_MASKS[pos.index] & board.piece_mask(self.player.opponent(), King))
 
     def _checked_by_lateral(self, board, pos) -> bool:
-        config = [
-            (pos.row + 1, BOARD_MAX + 1, 1, True),
-            (pos.row - 1, BOARD_MIN - 1, -1, True),
-            (pos.col + 1, BOARD_MAX + 1, 1, False),
-            (pos.col - 1, BOARD_MIN - 1, -1, False)
-        ]
-
-        for c in config:
-            for n in range(c[0], c[1], c[2]):
-                curr_piece = board.get_piece(Square.at(n, pos.col) if c[3] else Square.at(pos.row, n))
-
-                if curr_piece is not None:
-                    if (isinstance(curr_piece, Rook) or isinstance(curr_piece, Queen)) and \
-                            curr_piece.player is not self.player:
-                        return True
-                    break
-        return False
+        opponent = self.player.opponent()
+        sliders = board.piece_mask(opponent, Rook) | board.piece_mask(opponent, Queen)
+        return self._checked_along_rays(board, attacks.LATERAL_RAYS[pos.index],
+                                        attacks.LATERAL_RAY_MASKS[pos.index], sliders)
 
     def _checked_by_diagonal(self, board, pos) -> bool:
-        direction = [(True, True), (False, True), (False, False), (True, False)]
-
-        for d in direction:
-            next_col = pos.col + 1 if d[1] else pos.col - 1
-            next_row_init = pos.row + 1 if d[0] else pos.row - 1
-            next_row_end = BOARD_MAX + 1 if d[0] else BOARD_MIN - 1
-            step = 1 if d[0] else -1
-
-            for next_row in range(next_row_init, next_row_end, step):
-                if next_col < 0 or next_col > 7:
-                    break
-                curr_piece = board.get_piece(Square.at(next_row, next_col))
-
+        opponent = self.player.opponent()
+        sliders = board.piece_mask(opponent, Bishop) | board.piece_mask(opponent, Queen)
+        return self._checked_along_rays(board, attacks.DIAGONAL_RAYS[pos.index],
+                                        attacks.DIAGONAL_RAY_MASKS[pos.index], sliders)
+
+    @staticmethod
+    def _checked_along_rays(board, rays, ray_masks, sliders) -> bool:
+        for ray, ray_mask in zip(rays, ray_masks):
+            if not ray_mask & sliders:
+                continue  # no attacker anywhere along this ray
+            for next_square in ray:
+                curr_piece = board.get_piece(next_square)
                 if curr_piece is not None:
-                    if (isinstance(curr_piece, Bishop) or isinstance(curr_piece, Queen)) and \
-                            curr_piece.player is not self.player:
+                    if (1 << next_square.index) & sliders:
                         return True
                     break
-
-                next_col = next_col + 1 if d[1] else next_col - 1
         return False
 
-    @abstractmethod
     def get_available_moves(self, board):
         """
         Get all squares that the piece is allowed to move to.
         """
+        return self.get_available_moves_from(board, board.find_piece(self))
+
+    @abstractmethod
+    def get_available_moves_from(self, board, pos):
+        """
+        Get all squares that the piece, standing on the given square, is allowed to move to.
+        """
         pass
 
     def move_to(self, board, new_square):
@@ -186,49 +171,51 @@ class Piece(ABC):
         """
         current_square = board.find_piece(self)
         board.move_piece(current_square, new_square)
-        self.moved = True
 
 
 class Pawn(Piece):
     """
     A class representing a chess pawn.
     """
+    __slots__ = ()
 
-    def get_available_moves(self, board):
+    kind = PAWN
+
+    def get_available_moves_from(self, board, pos):
         moves = []
-        white = self.player == Player.WHITE
-        pos = board.find_piece(self)
+        pushes = attacks.PAWN_PUSHES[self.player]
+        legal_targets = self._legal_targets(board, pos)
 
         # in front
-        self.maybe_add_square(
-            squarelist=moves,
-            square=Square.at(pos.row + 1 if white else pos.row - 1, pos.col),
-            board=board,
-            empty=True,
-            takeable=False)
-
-        if len(moves) == 1 and (not self.moved):
-            self.maybe_add_square(
+        one_step = pushes[pos.index]
+        if one_step is not None:
+            blocked = self._add_square(
                 squarelist=moves,
-                square=Square.at(pos.row + 2 if white else pos.row - 2, pos.col),
+                square=one_step,
                 board=board,
                 empty=True,
-                takeable=False)
+                takeable=False,
+                legal_targets=legal_targets)
+
+            two_step = pushes[one_step.index]
+            if not blocked and not board.has_moved(pos) and two_step is not None:
+                self._add_square(
+                    squarelist=moves,
+                    square=two_step,
+                    board=board,
+                    empty=True,
+                    takeable=False,
+                    legal_targets=legal_targets)
 
         # diagonal
-        self.maybe_add_square(
-            squarelist=moves,
-            square=Square.at(pos.row + 1 if white else pos.row - 1, pos.col - 1),
-            board=board,
-            empty=False,
-            takeable=True)
-
-        self.maybe_add_square(
-            squarelist=moves,
-            square=Square.at(pos.row + 1 if white else pos.row - 1, pos.col + 1),
-            board=board,
-            empty=False,
-            takeable=True)
+        for target in attacks.PAWN_ATTACKS[self.player][pos.index]:
+            self._add_square(
+                squarelist=moves,
+                square=target,
+                board=board,
+                empty=False,
+                takeable=True,
+                legal_targets=legal_targets)
 
         return moves
 
@@ -237,29 +224,22 @@ class Knight(Piece):
     """
     A class representing a chess knight.
     """
+    __slots__ = ()
 
-    def get_available_moves(self, board):
+    kind = KNIGHT
+
+    def get_available_moves_from(self, board, pos):
         moves = []
-        pos = board.find_piece(self)
-
-        config = [
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-        ]
-
-        for row_offset, col_offset in config:
-            self.maybe_add_square(
+        legal_targets = self._legal_targets(board, pos)
+
+        for target in attacks.KNIGHT_TARGETS[pos.index]:
+            self._add_square(
                 squarelist=moves,
-                square=Square.at(pos.row + row_offset, pos.col + col_offset),
+                square=target,
                 board=board,
                 empty=True,
-                takeable=True)
+                takeable=True,
+                legal_targets=legal_targets)
 
         return moves
 
@@ -268,10 +248,13 @@ class Bishop(Piece):
     """
     A class representing a chess bishop.
     """
+    __slots__ = ()
 
-    def get_available_moves(self, board):
+    kind = BISHOP
+
+    def get_available_moves_from(self, board, pos):
         moves = []
-        self.get_diagonal(moves, board.find_piece(self), board)
+        self.get_diagonal(moves, pos, board)
 
         return moves
 
@@ -280,10 +263,13 @@ class Rook(Piece):
     """
     A class representing a chess rook.
     """
+    __slots__ = ()
 
-    def get_available_moves(self, board):
+    kind = ROOK
+
+    def get_available_moves_from(self, board, pos):
         moves = []
-        self.get_lateral(moves, board.find_piece(self), board)
+        self.get_lateral(moves, pos, board)
 
         return moves
 
@@ -292,10 +278,12 @@ class Queen(Piece):
     """
     A class representing a chess queen.
     """
+    __slots__ = ()
 
-    def get_available_moves(self, board):
+    kind = QUEEN
+
+    def get_available_moves_from(self, board, pos):
         moves = []
-        pos = board.find_piece(self)
         self.get_diagonal(moves, pos, board)
         self.get_lateral(moves, pos, board)
 
@@ -306,11 +294,24 @@ class King(Piece):
     """
     A class representing a chess king.
     """
+    __slots__ = ()
 
-    def get_available_moves(self, board):
+    kind = KING
+
+    def _legal_targets(self, board, pos):
+        return ~legality.check_info(board, self.player).king_danger
+
+    def get_available_moves_from(self, board, pos):
         moves = []
-        pos = board.find_piece(self)
-        self.get_diagonal(moves, pos, board, is_king=True)
-        self.get_lateral(moves, pos, board, is_king=True)
+        legal_targets = self._legal_targets(board, pos)
+
+        for target in attacks.KING_TARGETS[pos.index]:
+            self._add_square(
+                squarelist=moves,
+                square=target,
+                board=board,
+                empty=True,
+                takeable=True,
+                legal_targets=legal_targets)
 
         return moves
@@ -0,0 +1,152 @@
+"""
+Opt-in instrumentation of the engine's hot functions.
+
+    with chessington.engine.profile() as stats:
+        board.legal_moves()
+    print(stats.report())
+
+While the block runs, each instrumented function is wrapped to count its calls and accumulate the
+wall time spent in it, both in total and on its own (leaving out time spent in other instrumented
+functions it calls). The wrappers are removed again when
+the block exits, so the engine runs unmodified, at full speed, the rest of the time.
+"""
+
+import cProfile
+import functools
+import marshal
+import time
+from contextlib import contextmanager
+
+_active = False
+
+
+class ProfileStats:
+    """
+    Call counts, cumulative wall time and own wall time (without that of instrumented functions
+    called), in seconds, per instrumented function.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.times = {}
+        self.own_times = {}
+        self.child_times = []  # for each instrumented call in progress, the time spent in its callees
+        self.code = {}
+        self.profiler = None
+
+    def report(self):
+        """A table of the instrumented functions, most time-consuming first"""
+        names = sorted(self.calls, key=lambda name: self.times[name], reverse=True)
+        width = max([len(name) for name in names] + [len('function')])
+        lines = [f'{"function":<{width}}  {"calls":>10}  {"total ms":>10}  {"own ms":>10}  {"per call us":>12}']
+        for name in names:
+            calls, total, own = self.calls[name], self.times[name], self.own_times[name]
+            if calls:
+                lines.append(f'{name:<{width}}  {calls:>10}  {total * 1e3:>10.2f}  {own * 1e3:>10.2f}  '
+                             f'{total / calls * 1e6:>12.2f}')
+        return '\n'.join(lines)
+
+    def dump_stats(self, path):
+        """
+        Write the results in the format of cProfile's dump_stats, for loading with pstats or viewers
+        such as snakeviz. If the block ran with use_cprofile=True the full cProfile data is written;
+        otherwise each instrumented function is recorded with its calls, own time (as tottime) and
+        cumulative time.
+        """
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+            return
+
+        stats = {}
+        for name, calls in self.calls.items():
+            if calls:
+                code = self.code[name]
+                key = (code.co_filename, code.co_firstlineno, name)
+                stats[key] = (calls, calls, self.own_times[name], self.times[name], {})
+        with open(path, 'wb') as output:
+            marshal.dump(stats, output)
+
+
+def _targets():
+    # (owner, attribute name, reported name) for every instrumented function
+    from chessington.engine import board, data, legality, pieces
+
+    targets = [
+        (pieces.Piece, 'maybe_add_square', 'Piece.maybe_add_square'),
+        (pieces.Piece, '_add_square', 'Piece._add_square'),
+        (pieces.Piece, '_is_illegal_move', 'Piece._is_illegal_move'),
+        (pieces.Piece, 'is_in_check', 'Piece.is_in_check'),
+        (pieces.Piece, 'get_available_moves', 'Piece.get_available_moves'),
+        (board.Board, 'find_piece', 'Board.find_piece'),
+        (board.Board, 'get_piece', 'Board.get_piece'),
+        (board.Board, 'set_piece', 'Board.set_piece'),
+        (board.Board, 'make_move', 'Board.make_move'),
+        (board.Board, 'unmake_move', 'Board.unmake_move'),
+        (board.Board, 'legal_moves', 'Board.legal_moves'),
+        (legality, 'check_info', 'legality.check_info'),
+        (data.Square, 'at', 'Square.at'),
+    ]
+    for piece_type in board.PIECE_TYPES:
+        name = f'{piece_type.__name__}.get_available_moves_from'
+        targets.append((piece_type, 'get_available_moves_from', name))
+    return targets
+
+
+def _instrument(func, name, stats):
+    calls, times, own_times, child_times = stats.calls, stats.times, stats.own_times, stats.child_times
+    calls[name] = 0
+    times[name] = 0.0
+    own_times[name] = 0.0
+    stats.code[name] = func.__code__
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        child_times.append(0.0)
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            times[name] += elapsed
+            own_times[name] += elapsed - child_times.pop()
+            calls[name] += 1
+            if child_times:
+                child_times[-1] += elapsed
+
+    return wrapper
+
+
+@contextmanager
+def profile(use_cprofile=False):
+    """
+    Count calls to, and time, the engine's hot functions for the duration of the block. With
+    use_cprofile the block also runs under cProfile, and dump_stats writes its full results.
+    """
+    global _active
+    if _active:
+        raise RuntimeError('Engine profiling is already active')
+
+    stats = ProfileStats()
+    originals = []
+    for owner, attribute, name in _targets():
+        original = owner.__dict__[attribute]
+        if isinstance(original, classmethod):
+            patched = classmethod(_instrument(original.__func__, name, stats))
+        else:
+            patched = _instrument(original, name, stats)
+        originals.append((owner, attribute, original))
+        setattr(owner, attribute, patched)
+
+    _active = True
+    if use_cprofile:
+        stats.profiler = cProfile.Profile()
+        stats.profiler.enable()
+    try:
+        yield stats
+    finally:
+        if stats.profiler is not None:
+            stats.profiler.disable()
+        for owner, attribute, original in reversed(originals):
+            setattr(owner, attribute, original)
+        _active = False
@@ -0,0 +1,158 @@
+"""
+Checking archives of games for illegal moves.
+
+Every game is replayed from its starting position with GameReplay, which plays moves with
+Board.move_piece and accepts only the moves the pieces' move generators allow. Each game gives one
+report: the number of plies, captures and checks played, the final position and, if the game went
+wrong, where and why.
+
+Games can be shared between a pool of worker processes. They are sent in batches, reports come back
+in the order of the games in the archive, and no more than max_in_flight batches are in the pool at
+once, so the archive is read only a little ahead of the reports being written.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from chessington.engine import binary, legality, pgn
+from chessington.engine.moves import move_flags, move_to_text, CAPTURE
+from chessington.engine.pgn import GameReplay, PgnError
+from chessington.engine.pieces import KING
+
+
+def read_archive(path):
+    """
+    Streams the games in a PGN file or a binary game file (see the binary module), telling them apart by
+    the file's header. Each game is a (number, headers, record, moves, error) tuple: its position in the
+    archive counting from 1, its tag pairs, its packed starting position (None to take it from the tags),
+    its moves in SAN or encoded, and why it could not be read (None if it could). A binary file that ends
+    part way through a game gives that game as one that could not be read, and ends there.
+    """
+    with open(path, 'rb') as archive:
+        is_binary = archive.read(len(binary.GAME_MAGIC)) == binary.GAME_MAGIC
+
+    if is_binary:
+        number = 0
+        try:
+            for record, moves in binary.read_games(path):
+                number += 1
+                yield number, {}, record, moves, None
+        except ValueError as error:  # the file ends part way through a game
+            yield number + 1, {}, None, (), str(error)
+    else:
+        with open(path, encoding='utf-8', errors='replace') as lines:
+            for number, (headers, moves, result, error) in enumerate(pgn.read_games(lines), 1):
+                if result is not None:
+                    headers.setdefault('Result', result)
+                yield number, headers, None, moves, error
+
+
+def referee_game(game):
+    """
+    Replays one game, as read by read_archive, and reports on it as a dict. The report's status is "ok",
+    "illegal" if a move could not be played (described under "illegal_move") or "malformed" if the game
+    could not be read or set up (described under "error").
+    """
+    number, headers, record, moves, error = game
+    report = {'game': number, 'headers': headers, 'status': 'ok', 'plies': 0, 'captures': 0, 'checks': 0}
+    try:
+        if error is not None:
+            raise PgnError(error)
+        replay = GameReplay(binary.decode_position(record)) if record is not None else \
+            GameReplay.from_headers(headers)
+        for player, kings in replay.board.bitboards.items():
+            if bin(kings[KING]).count('1') != 1:
+                raise PgnError(f'{player.name.title()} does not have exactly one king')
+    except ValueError as setup_error:  # a PgnError, or a corrupt record in a binary archive
+        report.update(status='malformed', error=str(setup_error))
+        return report
+
+    board = replay.board
+    for ply, notation in enumerate(moves, 1):
+        try:
+            move = replay.resolve(notation) if isinstance(notation, str) else replay.validate(notation)
+        except PgnError as move_error:
+            report.update(status='illegal', illegal_move={
+                'ply': ply,
+                'move': notation if isinstance(notation, str) else move_to_text(notation),
+                'fen': board.to_fen(),
+                'reason': str(move_error),
+            })
+            break
+        replay.play(move)
+        report['plies'] = ply
+        if move_flags(move) & CAPTURE:
+            report['captures'] += 1
+        if legality.check_info(board, board.current_player).checkers:
+            report['checks'] += 1
+
+    report['final_fen'] = board.to_fen()
+    return report
+
+
+def _referee_batch(games):
+    return [referee_game(game) for game in games]
+
+
+def referee_games(games, workers=1, batch_size=64, max_in_flight=None):
+    """
+    Reports on each of the games, in order, sharing them between the given number of worker processes
+    (None for one per CPU, 1 for no pool) in batches of batch_size. At most max_in_flight batches, by
+    default two per worker, are handed to the pool before their reports are yielded.
+    """
+    if workers == 1:
+        yield from map(referee_game, games)
+        return
+
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * workers
+    games = iter(games)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(islice(games, batch_size))
+            if not batch:
+                break
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_referee_batch, batch))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description='Check a PGN or binary game archive for illegal moves.')
+    parser.add_argument('archive', help='the PGN file or binary game file to check')
+    parser.add_argument('--output', help='file to write the JSON Lines reports to (default: standard output)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes, or 0 for one per CPU (default: 1, no pool)')
+    parser.add_argument('--batch-size', type=int, default=64, help='games sent to a worker at a time (default: 64)')
+    parser.add_argument('--max-in-flight', type=int,
+                        help='batches handed to the pool before their reports are written (default: 2 per worker)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Check a game archive from the command line, writing one JSON report per game"""
+    args = _parse_args(argv)
+    if args.batch_size < 1:
+        raise SystemExit('The batch size must be at least 1')
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    counts = {'ok': 0, 'illegal': 0, 'malformed': 0}
+    try:
+        for report in referee_games(read_archive(args.archive), args.workers or None, args.batch_size,
+                                    args.max_in_flight):
+            counts[report['status']] += 1
+            output.write(json.dumps(report) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f'Games: {sum(counts.values())}, ok: {counts["ok"]}, illegal: {counts["illegal"]}, '
+          f'malformed: {counts["malformed"]}', file=sys.stderr)
@@ -0,0 +1,167 @@
+"""
+Choosing a move: negamax alpha-beta search with iterative deepening.
+
+The search plays moves on the board it is given with make_move and takes them back with
+unmake_move, so no board is copied, and each ply has one move array that legal_moves refills at
+every node. Evaluation functions take a board and return its score in centipawns from the point of
+view of the player to move, as material here and evaluation.evaluate do.
+
+Moves are searched in the order given by a MoveOrderer (see the ordering module), which learns from
+the cutoffs found as the search goes. A Searcher given an opening book (see the book module) plays
+the book's move, when it has one, without searching.
+"""
+
+import time
+from array import array
+from typing import NamedTuple, Tuple, Optional
+
+from chessington.engine import legality
+from chessington.engine.evaluation import PIECE_VALUES
+from chessington.engine.moves import decode_move
+from chessington.engine.ordering import MoveOrderer
+
+MATE_SCORE = 100000
+INFINITY = MATE_SCORE + 1
+MAX_DEPTH = 64
+
+
+def material(board):
+    """
+    The material balance, in centipawns, from the point of view of the player to move.
+    """
+    own = board.bitboards[board.current_player]
+    other = board.bitboards[board.current_player.opponent()]
+    return sum(value * (bin(own[kind]).count('1') - bin(other[kind]).count('1'))
+               for kind, value in enumerate(PIECE_VALUES))
+
+
+class SearchResult(NamedTuple):
+    """
+    The outcome of a search: the best move found (None if there is no legal move) and its score, the
+    deepest iteration completed, the nodes visited and seconds taken overall, and the principal
+    variation. A move taken from an opening book has a depth of 0.
+    """
+    move: Optional[int]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+    pv: Tuple[int, ...]
+
+    @property
+    def nps(self):
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+
+class Searcher:
+    """
+    Searches positions with a given evaluation function, by default the material balance. With
+    order_moves=False moves are searched in the order they are generated, except that the previous
+    iteration's best move comes first at the root. With an OpeningBook given, positions in the book are
+    answered with the book's most played move instead of a search.
+
+    Each search deepens one ply at a time until it reaches the depth budget, exhausts the node budget or
+    finds a forced mate. A search cut short by the node budget returns the result of the last iteration
+    it completed; the first iteration always completes, so a move is found whenever there is one.
+    """
+
+    def __init__(self, evaluate=material, order_moves=True, book=None):
+        self.evaluate = evaluate
+        self.book = book
+        self.orderer = MoveOrderer(MAX_DEPTH) if order_moves else None
+        self.nodes = 0
+        self._node_limit = None
+        self._aborted = False
+        self._move_buffers = []
+        self._pv_lines = []
+
+    def search(self, board, depth=None, nodes=None, on_iteration=None):
+        """
+        Finds the best move for the player to move, searching at most `depth` plies deep and visiting
+        about `nodes` nodes at most. At least one of the two budgets must be given. on_iteration, if
+        given, is called with the SearchResult of each completed iteration.
+        """
+        if depth is None and nodes is None:
+            raise ValueError('A search needs a depth or node budget')
+        start = time.perf_counter()
+        if self.book is not None:
+            book_move = self.book.choose(board)
+            if book_move is not None:
+                return SearchResult(book_move, 0, 0, 0, time.perf_counter() - start, (book_move,))
+
+        max_depth = MAX_DEPTH if depth is None else min(depth, MAX_DEPTH)
+        while len(self._move_buffers) <= max_depth:
+            self._move_buffers.append(array('H'))
+            self._pv_lines.append([])
+
+        self.nodes = 0
+        self._node_limit = None
+        self._aborted = False
+        if self.orderer is not None:
+            self.orderer.new_search()
+        result = SearchResult(None, 0, 0, 0, 0.0, ())
+
+        for iteration in range(1, max_depth + 1):
+            score = self._negamax(board, iteration, 0, -INFINITY, INFINITY, result.move)
+            if self._aborted:
+                break
+            pv = tuple(self._pv_lines[0])
+            result = SearchResult(pv[0] if pv else None, score, iteration, self.nodes,
+                                  time.perf_counter() - start, pv)
+            if on_iteration is not None:
+                on_iteration(result)
+            if not pv or abs(score) > MATE_SCORE - MAX_DEPTH:
+                break  # no legal moves, or a forced mate that searching deeper cannot improve on
+            self._node_limit = nodes
+
+        return result._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def _negamax(self, board, depth, ply, alpha, beta, first_move=None):
+        self.nodes += 1
+        if self._node_limit is not None and self.nodes > self._node_limit:
+            self._aborted = True
+            return 0
+
+        pv_line = self._pv_lines[ply]
+        del pv_line[:]
+        if depth == 0:
+            return self.evaluate(board)
+
+        moves = board.legal_moves(self._move_buffers[ply])
+        if not moves:
+            if legality.check_info(board, board.current_player).checkers:
+                return ply - MATE_SCORE
+            return 0  # stalemate
+        if self.orderer is not None:
+            self.orderer.order(board, moves, ply, first_move)
+        elif first_move is not None and first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        best = -INFINITY
+        for move in moves:
+            board.make_move(*decode_move(move))
+            score = -self._negamax(board, depth - 1, ply + 1, -beta, -alpha)
+            board.unmake_move()
+            if self._aborted:
+                return 0
+
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    del pv_line[:]
+                    pv_line.append(move)
+                    pv_line.extend(self._pv_lines[ply + 1])
+                    if alpha >= beta:
+                        if self.orderer is not None:
+                            self.orderer.record_cutoff(move, ply, depth)
+                        break
+        return best
+
+
+def search(board, depth=None, nodes=None, evaluate=material):
+    """
+    Finds the best move for the player to move with a new Searcher, as Searcher.search.
+    """
+    return Searcher(evaluate).search(board, depth, nodes)
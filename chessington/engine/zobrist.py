@@ -0,0 +1,40 @@
+"""
+Random keys for Zobrist hashing of board positions.
+
+A position's hash is the XOR of one key per piece on the board (chosen by colour, piece type,
+square and, for pawns, whether the pawn has moved), a key for the castling rights and a key for
+black being the side to move. Castling rights are hashed rather than the moved flags of kings and
+rooks, as FEN does, so that boards holding the same FEN position have the same hash. The keys are
+drawn from a fixed seed, so hashes are stable between runs and between processes.
+"""
+
+import random
+from functools import reduce
+from operator import xor
+
+from chessington.engine.data import Player
+
+NUM_PIECE_TYPES = 6
+NUM_SQUARES = 64
+
+_random = random.Random(0x5A0B21)
+
+
+def _key_table():
+    return {
+        player: [[_random.getrandbits(64) for _ in range(NUM_SQUARES)] for _ in range(NUM_PIECE_TYPES)]
+        for player in Player
+    }
+
+
+def _castling_keys():
+    # One key per combination of the four castling rights, each combination the XOR of its rights' keys
+    right_keys = [_random.getrandbits(64) for _ in range(4)]
+    return tuple(reduce(xor, (key for bit, key in enumerate(right_keys) if rights >> bit & 1), 0)
+                 for rights in range(16))
+
+
+PIECE_KEYS = _key_table()
+MOVED_PAWN_KEYS = {player: [_random.getrandbits(64) for _ in range(NUM_SQUARES)] for player in Player}
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = _castling_keys()
@@ -0,0 +1,123 @@
+import pytest
+
+from chessington.engine import legality
+from chessington.engine.board import Board
+from chessington.engine.data import Player
+from chessington.engine.evaluation import evaluate
+from chessington.engine.perft import play_moves
+
+np = pytest.importorskip('numpy')
+
+from chessington.engine.batch import encode_boards, evaluate_batch, encode_bitboards, analyse_batch
+
+POSITIONS = [
+    [],
+    ['e2e4'],
+    ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5', 'a7a6', 'b5c6', 'd7c6'],
+    ['d2d4', 'd7d5', 'c2c4', 'd5c4', 'e2e3', 'b7b5', 'a2a4', 'c7c6', 'a4b5', 'c6b5', 'd1f3'],
+]
+
+
+# Checks, double checks, pins along files and diagonals, and positions with no legal moves
+ANALYSIS_FENS = [
+    '4k3/8/8/8/8/8/8/4K2R w K - 0 1',
+    '4k3/4r3/8/8/8/8/4B3/4K3 w - - 0 1',
+    '4k3/8/8/8/7b/8/5P2/4K3 w - - 0 1',
+    '4k3/8/8/8/7b/8/5N2/4K3 w - - 0 1',
+    '4k3/8/8/8/8/2n5/8/R3K2r w - - 0 1',
+    '4k3/8/8/4r3/8/8/4Q3/4K3 w - - 0 1',
+    '3qk3/8/8/8/8/8/4P3/3rKR2 w - - 0 1',
+    '6k1/5ppp/8/8/8/8/8/R3K3 b - - 0 1',
+    '7k/5Q2/6K1/8/8/8/8/8 b - - 0 1',
+    '8/8/8/2k5/3pP3/8/8/4K3 b - - 0 1',
+]
+
+
+def boards():
+    return [play_moves(Board.at_starting_position(), moves) for moves in POSITIONS]
+
+
+class TestEncodeBoards:
+
+    @staticmethod
+    def test_codes_follow_board():
+        # Act
+        codes, black_to_move = encode_boards(boards()[:2])
+
+        # Assert
+        assert codes.dtype == np.int8
+        assert codes.shape == (2, 64)
+        assert list(codes[0, :8]) == [4, 2, 3, 5, 6, 3, 2, 4]
+        assert list(codes[0, 48:56]) == [-1] * 8
+        assert codes[1, 12] == 0 and codes[1, 28] == 1
+        assert list(black_to_move) == [False, True]
+
+
+class TestEvaluateBatch:
+
+    @staticmethod
+    def test_matches_single_position_evaluation():
+        # Arrange
+        positions = boards()
+        codes, black_to_move = encode_boards(positions)
+
+        # Act
+        scores = evaluate_batch(codes, black_to_move, chunk_size=3)
+
+        # Assert
+        assert list(scores) == [evaluate(board) for board in positions]
+
+    @staticmethod
+    def test_scores_from_white_without_side_to_move():
+        # Arrange
+        codes, _ = encode_boards(boards()[1:2])
+
+        # Act
+        scores = evaluate_batch(codes)
+
+        # Assert
+        assert list(scores) == [40]
+
+    @staticmethod
+    def test_rejects_wrong_shape():
+        # Act / Assert
+        with pytest.raises(ValueError):
+            evaluate_batch(np.zeros((3, 32), dtype=np.int8))
+
+
+class TestAnalyseBatch:
+
+    @staticmethod
+    def test_matches_single_position_move_generation():
+        # Arrange
+        positions = boards() + [Board.from_fen(fen) for fen in ANALYSIS_FENS]
+        bitboards, black_to_move = encode_bitboards(positions)
+
+        # Act
+        analysis = analyse_batch(bitboards, black_to_move)
+
+        # Assert
+        assert list(analysis.legal) == [len(board.legal_moves()) for board in positions]
+        assert list(analysis.in_check) == [bool(legality.check_info(board, board.current_player).checkers)
+                                           for board in positions]
+        assert [[int(mask) for mask in attacks] for attacks in analysis.attacks] == \
+            [[legality.attacked_squares(board, player) for player in (Player.WHITE, Player.BLACK)]
+             for board in positions]
+
+    @staticmethod
+    def test_pseudo_legal_counts_include_moves_into_check():
+        # Arrange
+        board = Board.from_fen('4k3/4r3/8/8/8/8/4B3/4K3 w - - 0 1')
+
+        # Act
+        analysis = analyse_batch(*encode_bitboards([board]))
+
+        # Assert
+        assert analysis.legal[0] == 4  # the king's four safe squares; the bishop is pinned
+        assert analysis.pseudo_legal[0] == 4 + 9
+
+    @staticmethod
+    def test_rejects_wrong_shape():
+        # Act / Assert
+        with pytest.raises(ValueError):
+            analyse_batch(np.zeros((3, 12), dtype=np.uint64), np.zeros(3, dtype=bool))
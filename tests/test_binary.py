@@ -0,0 +1,120 @@
+import pytest
+
+from chessington.engine.binary import encode_position, decode_position, write_positions, PositionFile, RECORD_SIZE, \
+    write_games, read_games
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import encode_move
+from chessington.engine.perft import play_moves
+from chessington.engine.pieces import Pawn
+
+
+class TestBinaryPositions:
+
+    @staticmethod
+    def test_record_is_fixed_width():
+        # Act
+        record = encode_position(Board.at_starting_position())
+
+        # Assert
+        assert len(record) == RECORD_SIZE == 36
+
+    @staticmethod
+    def test_position_round_trips():
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b Kq - 3 17')
+
+        # Act
+        decoded = decode_position(encode_position(board))
+
+        # Assert
+        assert decoded == board
+        assert decoded.to_fen() == board.to_fen()
+
+    @staticmethod
+    def test_moved_flags_survive_round_trip():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e1e2', 'e7e5'])
+
+        # Act
+        decoded = decode_position(encode_position(board))
+
+        # Assert
+        assert decoded.castling_rights() == 'kq'
+        assert decoded.get_piece(Square.at(4, 4)).moved
+        assert not decoded.get_piece(Square.at(1, 0)).moved
+        assert decoded.to_fen() == board.to_fen()
+
+    @staticmethod
+    @pytest.mark.parametrize('nibble', [0x7, 0x8, 0xF])
+    def test_corrupt_record_is_rejected(nibble):
+        # Arrange
+        record = bytearray(encode_position(Board.at_starting_position()))
+        record[0] = nibble
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            decode_position(record)
+
+
+class TestPositionFile:
+
+    @staticmethod
+    def test_positions_are_read_back_on_demand(tmp_path):
+        # Arrange
+        path = tmp_path / 'positions.bin'
+        boards = [
+            Board.at_starting_position(),
+            play_moves(Board.at_starting_position(), ['e2e4']),
+            play_moves(Board.at_starting_position(), ['d2d4', 'g8f6']),
+        ]
+        write_positions(path, boards)
+
+        # Act
+        with PositionFile(path) as positions:
+            read_back = list(positions)
+            last = positions[-1]
+
+        # Assert
+        assert read_back == boards
+        assert last.current_player == Player.WHITE
+        assert last.get_piece(Square.at(3, 3)) is Pawn.shared(Player.WHITE)
+
+    @staticmethod
+    def test_other_files_are_rejected(tmp_path):
+        # Arrange
+        path = tmp_path / 'not-positions.bin'
+        path.write_bytes(b'hello world')
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            PositionFile(path)
+
+
+class TestGameFile:
+
+    @staticmethod
+    def test_games_round_trip(tmp_path):
+        # Arrange
+        path = tmp_path / 'games.bin'
+        moves = [encode_move(Square.at(1, 4), Square.at(3, 4)), encode_move(Square.at(6, 4), Square.at(4, 4))]
+        games = [(Board.at_starting_position(), moves), (Board.from_fen('4k3/8/8/8/8/8/8/4K3 b - - 0 1'), [])]
+
+        # Act
+        count = write_games(path, games)
+        read_back = [(decode_position(record).to_fen(), list(game_moves)) for record, game_moves in read_games(path)]
+
+        # Assert
+        assert count == 2
+        assert read_back == [(board.to_fen(), list(game_moves)) for board, game_moves in games]
+
+    @staticmethod
+    def test_truncated_game_file_is_rejected(tmp_path):
+        # Arrange
+        path = tmp_path / 'games.bin'
+        write_games(path, [(Board.at_starting_position(), [encode_move(Square.at(1, 4), Square.at(3, 4))])])
+        path.write_bytes(path.read_bytes()[:-1])
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            list(read_games(path))
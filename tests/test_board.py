@@ -1,5 +1,10 @@
+import pytest
+
+from chessington.engine.binary import encode_position, decode_position
 from chessington.engine.board import Board
 from chessington.engine.data import Player, Square
+from chessington.engine.perft import play_moves
+from chessington.engine.pieces import Pawn, Knight, King
 
 def test_new_board_has_white_pieces_at_bottom():
 
@@ -35,4 +40,298 @@ def test_pieces_can_be_moved_on_the_board():
     board.move_piece(from_square, to_square)
 
     assert board.get_piece(from_square) is None
-    assert board.get_piece(to_square) is piece
\ No newline at end of file
+    assert board.get_piece(to_square) is piece
+
+def test_starting_board_bitboards_match_pieces():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_pawns = board.piece_mask(Player.WHITE, Pawn)
+    black_king = board.piece_mask(Player.BLACK, King)
+
+    # Assert
+    assert white_pawns == 0xFF00
+    assert black_king == 1 << 60
+    assert board.occupied == 0xFFFF00000000FFFF
+
+def test_bitboards_follow_moved_piece():
+
+    # Arrange
+    board = Board.at_starting_position()
+    from_square = Square.at(1, 0)
+    to_square = Square.at(3, 0)
+
+    # Act
+    board.move_piece(from_square, to_square)
+
+    # Assert
+    assert board.piece_mask(Player.WHITE, Pawn) == 0xFE00 | (1 << 24)
+    assert board.occupancy[Player.WHITE] & (1 << 8) == 0
+
+def test_replacing_piece_clears_old_bitboard():
+
+    # Arrange
+    board = Board.empty()
+    square = Square.at(4, 4)
+    board.set_piece(square, Pawn(Player.BLACK))
+
+    # Act
+    board.set_piece(square, Knight(Player.WHITE))
+
+    # Assert
+    assert board.piece_mask(Player.BLACK, Pawn) == 0
+    assert board.piece_mask(Player.WHITE, Knight) == 1 << 36
+
+def test_find_piece_follows_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+    from_square = Square.at(0, 1)
+    knight = board.get_piece(from_square)
+
+    # Act
+    to_square = Square.at(2, 2)
+    board.move_piece(from_square, to_square)
+
+    # Assert
+    assert board.find_piece(knight) == to_square
+
+def test_find_piece_raises_for_captured_piece():
+
+    # Arrange
+    board = Board.empty()
+    square = Square.at(4, 4)
+    captured = Pawn(Player.BLACK)
+    board.set_piece(square, captured)
+
+    # Act
+    board.set_piece(square, Knight(Player.WHITE))
+
+    # Assert
+    with pytest.raises(Exception):
+        board.find_piece(captured)
+
+def test_get_king_tracks_placed_and_removed_kings():
+
+    # Arrange
+    board = Board.empty()
+    king = King(Player.WHITE)
+    square = Square.at(0, 4)
+
+    # Act
+    board.set_piece(square, king)
+
+    # Assert
+    assert board.get_king(Player.WHITE) is king
+    assert board.get_king(Player.BLACK) is None
+
+    board.set_piece(square, None)
+    assert board.get_king(Player.WHITE) is None
+
+def test_unmake_move_restores_capture_and_side_to_move():
+
+    # Arrange
+    board = Board.empty()
+    from_square = Square.at(3, 3)
+    to_square = Square.at(4, 4)
+    pawn = Pawn(Player.WHITE)
+    captured = Knight(Player.BLACK)
+    board.set_piece(from_square, pawn)
+    board.set_piece(to_square, captured)
+
+    # Act
+    board.make_move(from_square, to_square)
+    board.unmake_move()
+
+    # Assert
+    assert board.get_piece(from_square) is pawn
+    assert board.get_piece(to_square) is captured
+    assert pawn.moved is False
+    assert board.current_player == Player.WHITE
+    assert board.find_piece(captured) == to_square
+
+def test_generating_moves_leaves_board_untouched():
+
+    # Arrange
+    board = Board.at_starting_position()
+    knight = board.get_piece(Square.at(0, 1))
+
+    # Act
+    knight.get_available_moves(board)
+
+    # Assert
+    assert board.find_piece(knight) == Square.at(0, 1)
+    assert board.current_player == Player.WHITE
+    assert knight.moved is False
+    assert board.undo_stack == []
+
+def test_zobrist_is_restored_by_unmake_move():
+
+    # Arrange
+    board = Board.at_starting_position()
+    initial_hash = board.zobrist
+
+    # Act
+    board.make_move(Square.at(1, 4), Square.at(3, 4))
+    moved_hash = board.zobrist
+    board.unmake_move()
+
+    # Assert
+    assert moved_hash != initial_hash
+    assert board.zobrist == initial_hash
+
+def test_transposed_positions_are_equal():
+
+    # Arrange
+    board1 = Board.at_starting_position()
+    board2 = Board.at_starting_position()
+
+    # Act
+    board1.move_piece(Square.at(0, 1), Square.at(2, 2))
+    board1.move_piece(Square.at(7, 6), Square.at(5, 5))
+    board1.move_piece(Square.at(0, 6), Square.at(2, 5))
+    board2.move_piece(Square.at(0, 6), Square.at(2, 5))
+    board2.move_piece(Square.at(7, 6), Square.at(5, 5))
+    board2.move_piece(Square.at(0, 1), Square.at(2, 2))
+
+    # Assert
+    assert board1 == board2
+    assert hash(board1) == hash(board2)
+    assert len({board1, board2}) == 1
+
+@pytest.mark.parametrize('flyweight', [False, True])
+def test_boards_round_tripped_through_fen_and_binary_are_equal(flyweight):
+
+    # Arrange
+    board = play_moves(Board.at_starting_position(flyweight), ['e2e4', 'e7e5', 'e1e2'])
+
+    # Act
+    from_fen = Board.from_fen(board.to_fen(), flyweight)
+    decoded = decode_position(encode_position(board), flyweight)
+
+    # Assert
+    assert from_fen == board
+    assert decoded == board
+    assert from_fen.zobrist == decoded.zobrist == board.zobrist
+
+def test_castling_rights_are_hashed():
+
+    # Arrange
+    board = Board.at_starting_position()
+    initial_hash = board.zobrist
+
+    # Act
+    play_moves(board, ['g1f3', 'g8f6', 'h1g1', 'f6g8', 'g1h1', 'g8f6', 'f3g1', 'f6g8'])
+
+    # Assert
+    assert board.castling_rights() == 'Qkq'
+    assert board.zobrist != initial_hash
+    assert board.zobrist == Board.from_fen(board.to_fen()).zobrist
+    while board.undo_stack:
+        board.unmake_move()
+    assert board.castling_rights() == 'KQkq'
+    assert board.zobrist == initial_hash
+
+def test_side_to_move_changes_position():
+
+    # Arrange
+    board1 = Board.at_starting_position()
+    board2 = Board.at_starting_position()
+
+    # Act
+    board2.current_player = Player.BLACK
+
+    # Assert
+    assert board1 != board2
+    assert board1.zobrist != board2.zobrist
+
+def test_squares_on_the_board_are_shared():
+
+    # Arrange
+    square = Square.at(3, 4)
+
+    # Act
+    same_square = Square(3, 4)
+
+    # Assert
+    assert square is same_square
+    assert square.index == 28
+    assert Square.from_index(28) is square
+
+def test_squares_off_the_board_are_still_comparable():
+
+    # Arrange
+    square = Square.at(-1, 4)
+
+    # Act
+    same_square = Square(row=-1, col=4)
+
+    # Assert
+    assert square == same_square
+    assert hash(square) == hash(same_square)
+    assert square != Square.at(1, 4)
+    assert square.index is None
+
+def test_flyweight_board_shares_pieces():
+
+    # Arrange
+    board = Board.at_starting_position(flyweight=True)
+
+    # Act
+    left_pawn = board.get_piece(Square.at(1, 0))
+    right_pawn = board.get_piece(Square.at(1, 7))
+
+    # Assert
+    assert left_pawn is right_pawn is Pawn.shared(Player.WHITE)
+    assert not hasattr(left_pawn, '__dict__')
+
+def test_flyweight_board_tracks_moved_flags():
+
+    # Arrange
+    board = Board.at_starting_position(flyweight=True)
+    standard_board = Board.at_starting_position()
+    from_square = Square.at(1, 4)
+    to_square = Square.at(2, 4)
+
+    # Act
+    board.make_move(from_square, to_square)
+    standard_board.make_move(from_square, to_square)
+
+    # Assert
+    assert board.has_moved(to_square)
+    assert not board.has_moved(from_square)
+    assert board.zobrist == standard_board.zobrist
+    assert sorted(board.legal_moves()) == sorted(standard_board.legal_moves())
+
+    board.unmake_move()
+    assert not board.has_moved(from_square)
+    assert board == Board.at_starting_position(flyweight=True)
+
+def test_flyweight_board_finds_unique_pieces():
+
+    # Arrange
+    board = Board.at_starting_position(flyweight=True)
+
+    # Act
+    king_square = board.find_piece(King.shared(Player.BLACK))
+
+    # Assert
+    assert king_square == Square.at(7, 4)
+    with pytest.raises(Exception):
+        board.find_piece(Pawn.shared(Player.BLACK))
+
+def test_squares_off_the_board_cannot_be_read():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    off_board_square = Square.at(-1, 0)
+
+    # Assert
+    with pytest.raises(IndexError):
+        board.get_piece(off_board_square)
+    with pytest.raises(IndexError):
+        board.set_piece(off_board_square, Pawn(Player.WHITE))
@@ -0,0 +1,226 @@
+import random
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.book import build_book, OpeningBook, RECORD_SIZE, main
+from chessington.engine.moves import move_to_text
+from chessington.engine.perft import play_moves
+from chessington.engine.search import Searcher
+
+GAMES = '''[Event "One"]
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. O-O *
+
+[Event "Two"]
+1. e4 e5 2. Nf3 d6 *
+
+[Event "Three"]
+1. e4 c5 *
+
+[Event "Four"]
+1. d4 d5 *
+'''
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = tmp_path / 'book.bin'
+    build_book(GAMES.splitlines(), path)
+    return path
+
+
+def book_moves(book, board):
+    return {move_to_text(move): weight for move, weight in book.moves(board)}
+
+
+class TestBuildBook:
+
+    @staticmethod
+    def test_records_are_counted_once_per_position_and_move(book_path):
+        # Act
+        with OpeningBook(book_path) as book:
+            # Assert
+            assert len(book) == 11
+            assert book_path.stat().st_size == 8 + 11 * RECORD_SIZE
+
+    @staticmethod
+    def test_max_plies_limits_depth(tmp_path):
+        # Arrange
+        path = tmp_path / 'book.bin'
+
+        # Act
+        count = build_book(GAMES.splitlines(), path, max_plies=1)
+
+        # Assert
+        assert count == 2
+
+    @staticmethod
+    def test_min_count_drops_rare_moves(tmp_path):
+        # Arrange
+        path = tmp_path / 'book.bin'
+
+        # Act
+        build_book(GAMES.splitlines(), path, min_count=2)
+
+        # Assert
+        with OpeningBook(path) as book:
+            assert book_moves(book, Board.at_starting_position()) == {'e2e4': 3}
+
+
+class TestOpeningBook:
+
+    @staticmethod
+    def test_moves_are_weighted_by_games(book_path):
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4'])
+
+        # Act
+        with OpeningBook(book_path) as book:
+            moves = book_moves(book, board)
+
+        # Assert
+        assert moves == {'e7e5': 2, 'c7c5': 1}
+
+    @staticmethod
+    def test_position_read_from_fen_is_found(tmp_path):
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book(['1. e4 e5 2. Ke2 Nc6 *', '', '1. e4 e5 2. Ke2 Nc6 *'], path)
+        board = Board.from_fen('rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPPKPPP/RNBQ1BNR b kq - 1 2')
+
+        # Act
+        with OpeningBook(path) as book:
+            moves = book_moves(book, board)
+
+        # Assert
+        assert moves == {'b8c6': 2}
+
+    @staticmethod
+    def test_unknown_position_has_no_moves(book_path):
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['a2a3'])
+
+        # Act
+        with OpeningBook(book_path) as book:
+            # Assert
+            assert book.moves(board) == []
+            assert book.choose(board) is None
+
+    @staticmethod
+    def test_moves_the_board_cannot_play_are_passed_over(book_path):
+        # Arrange
+        board = play_moves(Board.at_starting_position(),
+                           ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'f8c5'])
+
+        # Act
+        with OpeningBook(book_path) as book:
+            # Assert
+            assert len(book.entries(board.zobrist)) == 1  # castling
+            assert book.moves(board) == []
+
+    @staticmethod
+    def test_choose_prefers_most_played_move(book_path):
+        # Act
+        with OpeningBook(book_path) as book:
+            move = book.choose(Board.at_starting_position())
+
+        # Assert
+        assert move_to_text(move) == 'e2e4'
+
+    @staticmethod
+    def test_choose_at_random_picks_book_moves(book_path):
+        # Arrange
+        rng = random.Random(1)
+
+        # Act
+        with OpeningBook(book_path) as book:
+            moves = {move_to_text(book.choose(Board.at_starting_position(), rng)) for _ in range(50)}
+
+        # Assert
+        assert moves == {'e2e4', 'd2d4'}
+
+    @staticmethod
+    def test_other_files_are_rejected(tmp_path):
+        # Arrange
+        path = tmp_path / 'not-a-book.bin'
+        path.write_bytes(b'CHESSGAM' + bytes(RECORD_SIZE))
+        empty = tmp_path / 'empty.bin'
+        empty.write_bytes(b'')
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            OpeningBook(path)
+        with pytest.raises(ValueError):
+            OpeningBook(empty)
+
+
+class TestBookSearch:
+
+    @staticmethod
+    def test_searcher_plays_book_move_without_searching(book_path):
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['d2d4'])
+
+        # Act
+        with OpeningBook(book_path) as book:
+            result = Searcher(book=book).search(board, depth=3)
+
+        # Assert
+        assert move_to_text(result.move) == 'd7d5'
+        assert (result.depth, result.nodes) == (0, 0)
+
+    @staticmethod
+    def test_searcher_finds_book_move_for_board_read_from_fen(book_path):
+        # Arrange
+        board = Board.from_fen('rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2')
+
+        # Act
+        with OpeningBook(book_path) as book:
+            result = Searcher(book=book).search(board, depth=3)
+
+        # Assert
+        assert move_to_text(result.move) == 'g1f3'
+        assert result.depth == 0
+
+    @staticmethod
+    def test_searcher_searches_out_of_book(book_path):
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['a2a3'])
+
+        # Act
+        with OpeningBook(book_path) as book:
+            result = Searcher(book=book).search(board, depth=2)
+
+        # Assert
+        assert result.depth == 2
+        assert result.nodes > 0
+
+
+class TestMain:
+
+    @staticmethod
+    def test_build_and_probe(tmp_path, capsys):
+        # Arrange
+        pgn = tmp_path / 'games.pgn'
+        pgn.write_text(GAMES)
+        book = tmp_path / 'book.bin'
+
+        # Act
+        main(['build', str(pgn), str(book)])
+        main(['probe', str(book), '--moves', 'e2e4'])
+
+        # Assert
+        assert capsys.readouterr().out.splitlines() == [f'Wrote 11 moves to {book}', 'e7e5: 2', 'c7c5: 1']
+
+    @staticmethod
+    def test_probe_by_fen(tmp_path, capsys):
+        # Arrange
+        book = tmp_path / 'book.bin'
+        build_book(['1. e4 e5 2. Ke2 Nc6 *', '', '1. e4 e5 2. Ke2 Nc6 *'], book)
+
+        # Act
+        main(['probe', str(book), '--fen', 'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPPKPPP/RNBQ1BNR b kq - 1 2'])
+        main(['probe', str(book), '--moves', 'e2e4', 'e7e5', 'e1e2'])
+
+        # Assert
+        assert capsys.readouterr().out.splitlines() == ['b8c6: 2', 'b8c6: 2']
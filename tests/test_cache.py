@@ -0,0 +1,59 @@
+from chessington.engine.board import Board
+from chessington.engine.cache import MoveCache
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Bishop, Pawn
+
+
+class TestMoveCache:
+
+    @staticmethod
+    def test_repeated_lookup_is_a_hit():
+        # Arrange
+        board = Board.at_starting_position()
+        cache = MoveCache()
+        knight_square = Square.at(0, 1)
+
+        # Act
+        first = cache.get_available_moves(board, knight_square)
+        second = cache.get_available_moves(board, knight_square)
+
+        # Assert
+        assert first == second == board.get_piece(knight_square).get_available_moves(board)
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    @staticmethod
+    def test_moving_a_piece_invalidates_entry():
+        # Arrange
+        board = Board.empty()
+        cache = MoveCache()
+        bishop_square = Square.at(0, 2)
+        board.set_piece(bishop_square, Bishop(Player.WHITE))
+        board.set_piece(Square.at(1, 3), Pawn(Player.WHITE))
+        cache.get_available_moves(board, bishop_square)
+
+        # Act
+        board.set_piece(Square.at(1, 3), None)
+        moves = cache.get_available_moves(board, bishop_square)
+
+        # Assert
+        assert Square.at(1, 3) in moves
+        assert cache.misses == 2
+
+    @staticmethod
+    def test_least_recently_used_entry_is_evicted():
+        # Arrange
+        board = Board.at_starting_position()
+        cache = MoveCache(max_entries=2)
+
+        # Act
+        cache.get_available_moves(board, Square.at(0, 1))
+        cache.get_available_moves(board, Square.at(0, 6))
+        cache.get_available_moves(board, Square.at(0, 1))
+        cache.get_available_moves(board, Square.at(1, 0))
+        cache.get_available_moves(board, Square.at(0, 1))
+
+        # Assert
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.hits == 2
@@ -337,5 +337,146 @@ class TestKingCannotMoveIntoCheck:
         assert Square.at(1, 5) in moves_black
         assert len(moves_black) == 5
 
-    # class TestPieceCannotMoveAndPutOwnKingIntoCheck:
     # class TestCheckMate:
+
+
+class TestCheckAtBoardEdge:
+
+    @staticmethod
+    def test_white_king_on_back_rank_not_checked_by_knight_on_far_rank():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        king_square = Square.at(0, 4)
+        board.set_piece(king_square, king)
+
+        enemy = Knight(Player.BLACK)
+        enemy_square = Square.at(7, 6)
+        board.set_piece(enemy_square, enemy)
+
+        # Act
+        check = king.is_in_check(board)
+
+        # Assert
+        assert check is False
+
+    @staticmethod
+    def test_white_king_on_edge_not_checked_by_pawn_on_far_file():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        king_square = Square.at(3, 0)
+        board.set_piece(king_square, king)
+
+        enemy = Pawn(Player.BLACK)
+        enemy_square = Square.at(4, 7)
+        board.set_piece(enemy_square, enemy)
+
+        # Act
+        check = king.is_in_check(board)
+
+        # Assert
+        assert check is False
+
+
+class TestPieceCannotMoveAndPutOwnKingIntoCheck:
+
+    @staticmethod
+    def test_pinned_rook_can_only_move_along_pin():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 4), king)
+
+        rook = Rook(Player.WHITE)
+        board.set_piece(Square.at(2, 4), rook)
+
+        enemy = Queen(Player.BLACK)
+        enemy_square = Square.at(6, 4)
+        board.set_piece(enemy_square, enemy)
+
+        # Act
+        moves = rook.get_available_moves(board)
+
+        # Assert
+        assert Square.at(1, 4) in moves
+        assert enemy_square in moves
+        assert Square.at(2, 3) not in moves
+        assert Square.at(2, 5) not in moves
+        assert len(moves) == 5
+
+    @staticmethod
+    def test_diagonally_pinned_knight_cannot_move():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 0), king)
+
+        knight = Knight(Player.WHITE)
+        board.set_piece(Square.at(2, 2), knight)
+
+        enemy = Bishop(Player.BLACK)
+        board.set_piece(Square.at(5, 5), enemy)
+
+        # Act
+        moves = knight.get_available_moves(board)
+
+        # Assert
+        assert len(moves) == 0
+
+    @staticmethod
+    def test_piece_must_block_or_capture_checker():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 4), king)
+
+        bishop = Bishop(Player.WHITE)
+        board.set_piece(Square.at(2, 2), bishop)
+
+        enemy = Rook(Player.BLACK)
+        enemy_square = Square.at(0, 0)
+        board.set_piece(enemy_square, enemy)
+
+        # Act
+        moves = bishop.get_available_moves(board)
+
+        # Assert
+        assert Square.at(0, 4) not in moves
+        assert sorted(moves, key=lambda square: square.col) == [enemy_square]
+
+    @staticmethod
+    def test_only_king_can_move_in_double_check():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 4), king)
+
+        queen = Queen(Player.WHITE)
+        board.set_piece(Square.at(3, 3), queen)
+
+        board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+        board.set_piece(Square.at(2, 3), Knight(Player.BLACK))
+
+        # Act
+        moves = queen.get_available_moves(board)
+
+        # Assert
+        assert len(moves) == 0
+
+    @staticmethod
+    def test_king_cannot_step_back_along_checking_line():
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(3, 3), king)
+
+        board.set_piece(Square.at(3, 7), Rook(Player.BLACK))
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert Square.at(3, 2) not in moves
+        assert Square.at(3, 4) not in moves
+        assert len(moves) == 6
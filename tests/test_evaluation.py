@@ -0,0 +1,138 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.evaluation import evaluate, incremental_evaluate, SQUARE_VALUES, PIECE_VALUES
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import decode_move
+from chessington.engine.perft import play_moves
+from chessington.engine.pgn import PgnReader
+from chessington.engine.pieces import Queen, PAWN, KNIGHT, KING
+from chessington.engine.search import Searcher
+
+
+class TestEvaluate:
+
+    @staticmethod
+    def test_starting_position_is_level():
+        # Act
+        score = evaluate(Board.at_starting_position())
+
+        # Assert
+        assert score == 0
+
+    @staticmethod
+    def test_black_tables_mirror_white():
+        # Assert
+        assert SQUARE_VALUES[Player.WHITE][KNIGHT][6] == SQUARE_VALUES[Player.BLACK][KNIGHT][62]
+        assert SQUARE_VALUES[Player.WHITE][PAWN][12] == PIECE_VALUES[PAWN] - 20
+        assert SQUARE_VALUES[Player.BLACK][KING][62] == 30
+
+    @staticmethod
+    def test_score_is_from_side_to_move():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4'])
+
+        # Act
+        score = evaluate(board)
+
+        # Assert
+        assert score == -40  # e2 is worth -20 to a pawn and e4 is worth 20
+
+    @staticmethod
+    def test_material_counts():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+
+        # Act
+        score = evaluate(board)
+
+        # Assert
+        assert score == 500
+
+
+class TestEvalTerms:
+
+    @staticmethod
+    def test_not_tracked_by_default():
+        # Act
+        board = Board.at_starting_position()
+
+        # Assert
+        assert board.eval_terms is None
+
+    @staticmethod
+    def test_tracked_totals_start_from_position():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+
+        # Act
+        terms = board.track_eval_terms()
+
+        # Assert
+        assert terms.material == {Player.WHITE: 500, Player.BLACK: 0}
+        assert terms.placement == {Player.WHITE: 0, Player.BLACK: 0}
+        assert board.track_eval_terms() is terms
+
+    @staticmethod
+    def test_terms_follow_moves_captures_and_unmakes():
+        # Arrange
+        rng = random.Random(7)
+        board = Board.at_starting_position()
+        board.track_eval_terms()
+        scores = []
+
+        # Act
+        for _ in range(60):
+            moves = board.legal_moves()
+            if not moves:
+                break
+            board.make_move(*decode_move(rng.choice(moves)))
+            scores.append((incremental_evaluate(board), evaluate(board)))
+        while board.undo_stack:
+            board.unmake_move()
+
+        # Assert
+        assert all(incremental == scratch for incremental, scratch in scores)
+        assert incremental_evaluate(board) == 0
+        assert board.eval_terms.material == {Player.WHITE: 4000, Player.BLACK: 4000}
+
+    @staticmethod
+    def test_terms_follow_set_piece_in_flyweight_mode():
+        # Arrange
+        board = Board.empty(flyweight=True)
+        board.track_eval_terms()
+
+        # Act
+        board.set_piece(Square.at(3, 3), Queen.shared(Player.BLACK))
+        board.set_piece(Square.at(3, 3), Queen.shared(Player.WHITE))
+
+        # Assert
+        assert board.eval_terms.material == {Player.WHITE: 900, Player.BLACK: 0}
+        assert incremental_evaluate(board) == evaluate(board) == 905
+
+    @staticmethod
+    def test_terms_follow_replayed_special_moves():
+        # Arrange
+        lines = ['[FEN "r3k3/1P6/8/8/8/8/8/4K2R w K - 0 1"]', '1. bxa8=Q+ Kd7 2. O-O *']
+        reader = PgnReader(lines, skip_malformed=False)
+        board = None
+
+        # Act
+        for _, board, _ in reader:
+            board.track_eval_terms()
+
+        # Assert
+        assert incremental_evaluate(board) == evaluate(board)
+
+    @staticmethod
+    def test_search_scores_match_with_incremental_evaluation():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4', 'd7d5'])
+
+        # Act
+        scratch = Searcher(evaluate).search(board, depth=3)
+        incremental = Searcher(incremental_evaluate).search(board, depth=3)
+
+        # Assert
+        assert incremental.score == scratch.score
+        assert incremental.nodes == scratch.nodes
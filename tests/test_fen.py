@@ -0,0 +1,107 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, King
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+
+class TestFen:
+
+    @staticmethod
+    def test_starting_position_from_fen():
+        # Act
+        board = Board.from_fen(STARTING_FEN)
+
+        # Assert
+        assert board == Board.at_starting_position()
+        assert isinstance(board.get_piece(Square.at(0, 4)), King)
+        assert board.get_piece(Square.at(7, 0)).player == Player.BLACK
+
+    @staticmethod
+    def test_starting_position_to_fen():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        fen = board.to_fen()
+
+        # Assert
+        assert fen == STARTING_FEN
+
+    @staticmethod
+    def test_moves_update_side_and_counters():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        board.move_piece(Square.at(1, 4), Square.at(3, 4))
+        board.move_piece(Square.at(7, 6), Square.at(5, 5))
+        board.move_piece(Square.at(0, 6), Square.at(2, 5))
+
+        # Assert
+        assert board.to_fen() == 'rnbqkb1r/pppppppp/5n2/8/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 2 2'
+
+    @staticmethod
+    def test_unmake_move_restores_counters():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 w Q - 7 30')
+
+        # Act
+        board.make_move(Square.at(0, 0), Square.at(5, 0))
+        board.unmake_move()
+
+        # Assert
+        assert board.to_fen() == '4k3/8/8/8/8/8/8/R3K3 w Q - 7 30'
+
+    @staticmethod
+    def test_castling_rights_map_to_moved_flags():
+        # Act
+        board = Board.from_fen('r3k2r/8/8/8/8/8/8/R3K2R b Kq - 0 1')
+
+        # Assert
+        assert board.current_player == Player.BLACK
+        assert not board.get_piece(Square.at(0, 4)).moved
+        assert not board.get_piece(Square.at(0, 7)).moved
+        assert board.get_piece(Square.at(0, 0)).moved
+        assert not board.get_piece(Square.at(7, 0)).moved
+        assert board.get_piece(Square.at(7, 7)).moved
+        assert board.to_fen() == 'r3k2r/8/8/8/8/8/8/R3K2R b Kq - 0 1'
+
+    @staticmethod
+    def test_pawns_off_their_starting_row_have_moved():
+        # Act
+        board = Board.from_fen('4k3/8/8/8/8/4P3/3P4/4K3 w - - 0 1')
+
+        # Assert
+        moved_pawn = board.get_piece(Square.at(2, 4))
+        unmoved_pawn = board.get_piece(Square.at(1, 3))
+        assert moved_pawn.moved
+        assert not unmoved_pawn.moved
+        assert Square.at(3, 3) in unmoved_pawn.get_available_moves(board)
+
+    @staticmethod
+    def test_flyweight_board_from_fen():
+        # Act
+        board = Board.from_fen('4k3/8/8/8/8/4P3/3P4/4K3 w - - 0 1', flyweight=True)
+
+        # Assert
+        assert board.get_piece(Square.at(2, 4)) is Pawn.shared(Player.WHITE)
+        assert board.has_moved(Square.at(2, 4))
+        assert not board.has_moved(Square.at(1, 3))
+        assert board == Board.from_fen('4k3/8/8/8/8/4P3/3P4/4K3 w - - 0 1')
+
+    @staticmethod
+    @pytest.mark.parametrize('fen', [
+        '',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+        'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - zero 1',
+    ])
+    def test_invalid_fen_is_rejected(fen):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            Board.from_fen(fen)
@@ -0,0 +1,79 @@
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.moves import encode_move, decode_move, move_flags, CAPTURE, DOUBLE_PAWN_PUSH
+from chessington.engine.pieces import Pawn, Rook, King
+
+
+class TestMoveEncoding:
+
+    @staticmethod
+    def test_encoded_move_round_trips():
+        # Arrange
+        from_square = Square.at(1, 4)
+        to_square = Square.at(3, 4)
+
+        # Act
+        move = encode_move(from_square, to_square, DOUBLE_PAWN_PUSH)
+
+        # Assert
+        assert decode_move(move) == (from_square, to_square)
+        assert move_flags(move) == DOUBLE_PAWN_PUSH
+        assert 0 <= move < 1 << 16
+
+
+class TestLegalMoves:
+
+    @staticmethod
+    def test_starting_position_has_twenty_moves():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert len(moves) == 20
+        assert moves.typecode == 'H'
+
+    @staticmethod
+    def test_legal_moves_match_piece_moves():
+        # Arrange
+        board = Board.at_starting_position()
+        knight_square = Square.at(0, 6)
+        knight = board.get_piece(knight_square)
+
+        # Act
+        moves = [decode_move(move) for move in board.legal_moves()]
+
+        # Assert
+        knight_moves = [to_square for from_square, to_square in moves if from_square == knight_square]
+        assert knight_moves == knight.get_available_moves(board)
+
+    @staticmethod
+    def test_only_side_to_move_is_listed():
+        # Arrange
+        board = Board.at_starting_position()
+        board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+        # Act
+        moves = [decode_move(move) for move in board.legal_moves()]
+
+        # Assert
+        assert all(board.get_piece(from_square).player == Player.BLACK for from_square, _ in moves)
+
+    @staticmethod
+    def test_captures_are_flagged():
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(7, 7), King(Player.BLACK))
+        board.set_piece(Square.at(3, 3), Pawn(Player.WHITE))
+        board.set_piece(Square.at(4, 4), Rook(Player.BLACK))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        capture = encode_move(Square.at(3, 3), Square.at(4, 4), CAPTURE)
+        assert capture in moves
+        assert move_flags(encode_move(Square.at(3, 3), Square.at(4, 3))) == 0
@@ -0,0 +1,150 @@
+from array import array
+
+from chessington.engine.board import Board
+from chessington.engine.moves import encode_move, move_to_text, parse_square, CAPTURE
+from chessington.engine.data import Square
+from chessington.engine.ordering import MoveOrderer, mvv_lva, HISTORY_LIMIT
+from chessington.engine.perft import play_moves
+from chessington.engine.pieces import PAWN, KNIGHT, QUEEN
+from chessington.engine.search import Searcher
+
+# White can take the queen on d5 with the pawn or the rook, or the knight on b5 with the pawn
+CAPTURES_FEN = '4k3/8/8/1n1q4/2P5/8/3R4/4K3 w - - 0 1'
+
+
+def quiet(from_name, to_name):
+    return encode_move(parse_square(from_name), parse_square(to_name))
+
+
+class TestMvvLva:
+
+    @staticmethod
+    def test_prefers_valuable_victims_then_cheap_attackers():
+        # Assert
+        assert mvv_lva(QUEEN, PAWN) > mvv_lva(QUEEN, KNIGHT) > mvv_lva(KNIGHT, PAWN)
+
+
+class TestMoveOrderer:
+
+    @staticmethod
+    def test_captures_come_first_by_mvv_lva():
+        # Arrange
+        board = Board.from_fen(CAPTURES_FEN)
+        orderer = MoveOrderer()
+
+        # Act
+        moves = orderer.order(board, board.legal_moves(), 0)
+
+        # Assert
+        assert [move_to_text(move) for move in moves[:3]] == ['c4d5', 'd2d5', 'c4b5']
+
+    @staticmethod
+    def test_hash_move_comes_first():
+        # Arrange
+        board = Board.from_fen(CAPTURES_FEN)
+        orderer = MoveOrderer()
+        hash_move = quiet('e1', 'f1')
+
+        # Act
+        moves = orderer.order(board, board.legal_moves(), 0, hash_move)
+
+        # Assert
+        assert moves[0] == hash_move
+        assert move_to_text(moves[1]) == 'c4d5'
+
+    @staticmethod
+    def test_killers_come_after_captures_and_before_other_quiet_moves():
+        # Arrange
+        board = Board.from_fen(CAPTURES_FEN)
+        orderer = MoveOrderer()
+        orderer.record_cutoff(quiet('e1', 'f1'), 3, 1)
+        orderer.record_cutoff(quiet('d2', 'h2'), 3, 1)
+
+        # Act
+        moves = orderer.order(board, board.legal_moves(), 3)
+
+        # Assert
+        assert [move_to_text(move) for move in moves[3:5]] == ['d2h2', 'e1f1']
+
+    @staticmethod
+    def test_killers_are_kept_per_ply():
+        # Arrange
+        board = Board.from_fen(CAPTURES_FEN)
+        orderer = MoveOrderer()
+        orderer.record_cutoff(quiet('d2', 'h2'), 3, 1)
+
+        # Act
+        moves = orderer.order(board, board.legal_moves(), 4)
+
+        # Assert
+        assert orderer.killers[4] == [None, None]
+        assert move_to_text(moves[3]) == 'd2h2'  # still first by its history score
+
+    @staticmethod
+    def test_history_orders_quiet_moves():
+        # Arrange
+        board = Board.at_starting_position()
+        orderer = MoveOrderer()
+        orderer.record_cutoff(quiet('g1', 'f3'), 0, 2)
+        orderer.record_cutoff(quiet('b1', 'c3'), 0, 3)
+        orderer.new_search()
+
+        # Act
+        moves = orderer.order(board, board.legal_moves(), 0)
+
+        # Assert
+        assert [move_to_text(move) for move in moves[:2]] == ['b1c3', 'g1f3']
+
+    @staticmethod
+    def test_captures_are_not_recorded():
+        # Arrange
+        orderer = MoveOrderer()
+        capture = encode_move(Square.at(3, 2), Square.at(4, 3), CAPTURE)
+
+        # Act
+        orderer.record_cutoff(capture, 0, 4)
+
+        # Assert
+        assert orderer.killers[0] == [None, None]
+        assert not any(orderer.history)
+
+    @staticmethod
+    def test_history_is_halved_at_limit():
+        # Arrange
+        orderer = MoveOrderer()
+        move = quiet('g1', 'f3')
+        orderer.history[move & 0xFFF] = HISTORY_LIMIT
+
+        # Act
+        orderer.record_cutoff(move, 0, 2)
+
+        # Assert
+        assert orderer.history[move & 0xFFF] == (HISTORY_LIMIT + 4) // 2
+
+    @staticmethod
+    def test_order_keeps_every_move():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4', 'd7d5'])
+        moves = board.legal_moves()
+
+        # Act
+        ordered = MoveOrderer().order(board, array('H', moves), 0)
+
+        # Assert
+        assert sorted(ordered) == sorted(moves)
+
+
+class TestOrderedSearch:
+
+    @staticmethod
+    def test_ordering_shrinks_tree_without_changing_result():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'f8c5'])
+
+        # Act
+        unordered = Searcher(order_moves=False).search(board, depth=4)
+        ordered = Searcher().search(board, depth=4)
+
+        # Assert
+        assert ordered.score == unordered.score
+        assert ordered.nodes < unordered.nodes / 2
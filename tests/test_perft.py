@@ -0,0 +1,64 @@
+from chessington.engine.board import Board
+from chessington.engine.moves import move_to_text
+from chessington.engine.perft import perft, divide, parallel_divide, play_moves, main
+
+
+class TestPerft:
+
+    @staticmethod
+    def test_starting_position_counts():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        counts = [perft(board, depth) for depth in range(4)]
+
+        # Assert
+        assert counts == [1, 20, 400, 8902]
+
+    @staticmethod
+    def test_perft_leaves_board_unchanged():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        perft(board, 3)
+
+        # Assert
+        assert board == Board.at_starting_position()
+        assert board.undo_stack == []
+
+    @staticmethod
+    def test_divide_sums_to_perft():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4'])
+
+        # Act
+        counts = dict((move_to_text(move), nodes) for move, nodes in divide(board, 2))
+
+        # Assert
+        assert sum(counts.values()) == perft(board, 2) == 600
+        assert counts['e7e5'] == 29
+
+    @staticmethod
+    def test_main_reports_nodes(capsys):
+        # Act
+        main(['2'])
+
+        # Assert
+        output = capsys.readouterr().out
+        assert 'e2e4: 20' in output
+        assert 'Nodes searched: 400' in output
+        assert 'Nodes per second:' in output
+
+    @staticmethod
+    def test_parallel_divide_matches_divide():
+        # Arrange
+        board = play_moves(Board.at_starting_position(), ['e2e4', 'd7d5'])
+
+        # Act
+        serial = divide(board, 3)
+        parallel = parallel_divide(board, 3, workers=2)
+
+        # Assert
+        assert parallel == serial
@@ -0,0 +1,235 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+from chessington.engine.moves import encode_move, move_to_text, move_flags, CASTLE, EN_PASSANT, PROMOTION, CAPTURE
+from chessington.engine.pgn import PgnReader, PgnError, GameReplay, tokenize, read_games, HEADER, MOVE, RESULT, MALFORMED
+from chessington.engine.pieces import Queen, Knight
+
+OPERA_GAME = '''[Event "Paris"]
+[White "Morphy, Paul"]
+[Black "Duke Karl / Count Isouard"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 {This is a weak move} 4. dxe5 Bxf3 5. Qxf3 dxe5 6. Bc4 Nf6
+7. Qb3 Qe7 8. Nc3 c6 9. Bg5 b5 (9... Qb4 10. Qxb4) 10. Nxb5 cxb5 11. Bxb5+ Nbd7 12. O-O-O Rd8
+13. Rxd7 Rxd7 14. Rd1 Qe6 15. Bxd7+ Nxd7 16. Qb8+ Nxb8 17. Rd8# 1-0
+'''
+
+
+def play_game(movetext, fen=None):
+    game = GameReplay.from_headers({} if fen is None else {'FEN': fen})
+    moves = []
+    for event, san in tokenize([movetext]):
+        moves.append(game.resolve(san))
+        game.play(moves[-1])
+    return game.board, moves
+
+
+class TestTokenize:
+
+    @staticmethod
+    def test_comments_variations_and_annotations_are_dropped():
+        # Arrange
+        lines = ['[Event "Test"]', '1. e4 {a comment', 'over two lines} e5 $1 (1... c5 (1... e6)) 2.Nf3 ; rest',
+                 '% escaped', '2... Nc6 1/2-1/2']
+
+        # Act
+        events = list(tokenize(lines))
+
+        # Assert
+        assert events == [(HEADER, ('Event', 'Test')), (MOVE, 'e4'), (MOVE, 'e5'), (MOVE, 'Nf3'), (MOVE, 'Nc6'),
+                          (RESULT, '1/2-1/2')]
+
+    @staticmethod
+    def test_bad_tag_pair_is_malformed():
+        # Act
+        events = list(tokenize(['[Event Test]']))
+
+        # Assert
+        assert events == [(MALFORMED, '[Event Test]')]
+
+
+class TestReadGames:
+
+    @staticmethod
+    def test_games_are_split_without_replaying():
+        # Arrange
+        lines = ['[Event "One"]', '1. e4 Qh1 1-0', '[Event "Two"', '1. d4']
+
+        # Act
+        games = list(read_games(lines))
+
+        # Assert
+        assert games == [({'Event': 'One'}, ['e4', 'Qh1'], '1-0', None),
+                         ({}, ['d4'], None, "Malformed line: '[Event \"Two\"'")]
+
+
+class TestPgnReader:
+
+    @staticmethod
+    def test_replays_whole_game():
+        # Arrange
+        reader = PgnReader(OPERA_GAME.splitlines())
+
+        # Act
+        moves = [(headers['White'], move_to_text(move)) for headers, board, move in reader]
+
+        # Assert
+        assert len(moves) == 33
+        assert moves[0] == ('Morphy, Paul', 'e2e4')
+        assert moves[-1] == ('Morphy, Paul', 'd1d8')
+        assert reader.games_read == 1
+        assert reader.games_skipped == 0
+
+    @staticmethod
+    def test_yields_position_before_each_move():
+        # Arrange
+        reader = PgnReader(['1. e4 e5 *'])
+
+        # Act
+        positions = [board.to_fen() for _, board, _ in reader]
+
+        # Assert
+        assert positions == ['rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                             'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1']
+
+    @staticmethod
+    def test_malformed_game_is_skipped():
+        # Arrange
+        lines = ['[Event "Bad"]', '1. e4 e5 2. Ke3 Nc6 0-1', '', '[Event "Good"]', '1. d4 d5 1/2-1/2']
+        reader = PgnReader(lines)
+
+        # Act
+        events = [(headers['Event'], move_to_text(move)) for headers, _, move in reader]
+
+        # Assert
+        assert events == [('Bad', 'e2e4'), ('Bad', 'e7e5'), ('Good', 'd2d4'), ('Good', 'd7d5')]
+        assert reader.games_read == 1
+        assert reader.games_skipped == 1
+        assert isinstance(reader.last_error, PgnError)
+
+    @staticmethod
+    def test_malformed_game_raises_when_not_skipping():
+        # Arrange
+        reader = PgnReader(['1. e4 e5 2. Qh8 *'], skip_malformed=False)
+
+        # Act / Assert
+        with pytest.raises(PgnError):
+            list(reader)
+
+    @staticmethod
+    def test_game_without_result_ends_at_next_tag_pair():
+        # Arrange
+        reader = PgnReader(['[Event "One"]', '1. e4', '[Event "Two"]', '1. d4'])
+
+        # Act
+        events = [headers['Event'] for headers, _, _ in reader]
+
+        # Assert
+        assert events == ['One', 'Two']
+        assert reader.games_read == 2
+
+    @staticmethod
+    def test_game_starts_from_fen_tag():
+        # Act
+        board, moves = play_game('1. Ra8#', fen='6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+
+        # Assert
+        assert [move_to_text(move) for move in moves] == ['a1a8']
+
+
+class TestGameReplay:
+
+    @staticmethod
+    def test_disambiguates_by_file():
+        # Arrange
+        replay = GameReplay(Board.from_fen('4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1'))
+
+        # Act
+        move = replay.resolve('Nbd2')
+
+        # Assert
+        assert move_to_text(move) == 'b1d2'
+
+    @staticmethod
+    def test_ambiguous_move_is_rejected():
+        # Arrange
+        replay = GameReplay(Board.from_fen('4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1'))
+
+        # Act / Assert
+        with pytest.raises(PgnError):
+            replay.resolve('Nd2')
+
+    @staticmethod
+    def test_castling_moves_king_and_rook():
+        # Act
+        board, moves = play_game('1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. O-O')
+
+        # Assert
+        assert move_flags(moves[-1]) == CASTLE
+        assert board.to_fen() == 'r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 5 4'
+
+    @staticmethod
+    def test_cannot_castle_through_check():
+        # Arrange
+        replay = GameReplay(Board.from_fen('4k3/8/8/8/8/8/5r2/4K2R w K - 0 1'))
+
+        # Act / Assert
+        with pytest.raises(PgnError):
+            replay.resolve('O-O')
+
+    @staticmethod
+    def test_en_passant_removes_captured_pawn():
+        # Act
+        board, moves = play_game('1. e4 a6 2. e5 d5 3. exd6')
+
+        # Assert
+        assert move_flags(moves[-1]) == EN_PASSANT
+        assert board.get_piece(Square.at(4, 3)) is None
+        assert board.to_fen() == 'rnbqkbnr/1pp1pppp/p2P4/8/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 3'
+
+    @staticmethod
+    def test_en_passant_that_exposes_king_is_illegal():
+        # Arrange
+        replay = GameReplay(Board.from_fen('4k3/8/8/K2pP2r/8/8/8/8 w - d6 0 1'),
+                            en_passant=Square.at(5, 3))
+
+        # Act / Assert
+        with pytest.raises(PgnError):
+            replay.resolve('exd6')
+
+    @staticmethod
+    def test_promotion_places_new_piece():
+        # Act
+        board, moves = play_game('1. bxa8=N', fen='r3k3/1P6/8/8/8/8/8/4K3 w - - 0 1')
+
+        # Assert
+        assert move_flags(moves[-1]) & (PROMOTION | CAPTURE) == PROMOTION | CAPTURE
+        assert move_to_text(moves[-1]) == 'b7a8n'
+        assert isinstance(board.get_piece(Square.at(7, 0)), Knight)
+
+    @staticmethod
+    def test_promotion_in_flyweight_mode():
+        # Arrange
+        replay = GameReplay(Board.from_fen('4k3/P7/8/8/8/8/8/4K3 w - - 0 1', flyweight=True))
+
+        # Act
+        replay.play(replay.resolve('a8=Q+'))
+
+        # Assert
+        assert replay.board.get_piece(Square.at(7, 0)) is Queen.shared(replay.board.current_player.opponent())
+        assert replay.board == Board.from_fen('Q3k3/8/8/8/8/8/8/4K3 b - - 0 1')
+
+    @staticmethod
+    def test_validates_encoded_moves():
+        # Arrange
+        replay = GameReplay(Board.from_fen('4k3/8/8/8/8/8/8/4K2R w K - 0 1'))
+
+        # Act
+        castling = replay.validate(encode_move(Square.at(0, 4), Square.at(0, 6)))
+
+        # Assert
+        assert move_flags(castling) == CASTLE
+        with pytest.raises(PgnError):
+            replay.validate(encode_move(Square.at(0, 7), Square.at(1, 6)))
@@ -0,0 +1,80 @@
+import pstats
+
+import pytest
+
+import chessington.engine
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+
+
+class TestProfile:
+
+    @staticmethod
+    def test_counts_calls_inside_block():
+        # Arrange
+        board = Board.at_starting_position()
+        knight = board.get_piece(Square.at(0, 1))
+
+        # Act
+        with chessington.engine.profile() as stats:
+            knight.get_available_moves(board)
+            knight.get_available_moves(board)
+
+        # Assert
+        assert stats.calls['Piece.get_available_moves'] == 2
+        assert stats.calls['Board.find_piece'] == 2
+        assert stats.calls['Knight.get_available_moves_from'] == 2
+        assert stats.times['Piece.get_available_moves'] > 0
+        assert 'Board.find_piece' in stats.report()
+
+    @staticmethod
+    def test_instrumentation_is_removed_after_block():
+        # Arrange
+        original = Board.find_piece
+        board = Board.at_starting_position()
+
+        # Act
+        with chessington.engine.profile() as stats:
+            pass
+        board.find_piece(board.get_piece(Square.at(0, 0)))
+
+        # Assert
+        assert Board.find_piece is original
+        assert stats.calls['Board.find_piece'] == 0
+
+    @staticmethod
+    def test_profiles_cannot_be_nested():
+        # Act / Assert
+        with chessington.engine.profile():
+            with pytest.raises(RuntimeError):
+                with chessington.engine.profile():
+                    pass
+
+    @staticmethod
+    def test_dump_stats_loads_with_pstats(tmp_path):
+        # Arrange
+        board = Board.at_starting_position()
+        path = tmp_path / 'engine.prof'
+
+        # Act
+        with chessington.engine.profile() as stats:
+            board.legal_moves()
+        stats.dump_stats(str(path))
+
+        # Assert
+        loaded = pstats.Stats(str(path))
+        assert any(name == 'Board.legal_moves' for _, _, name in loaded.stats)
+        assert loaded.total_tt <= stats.times['Board.legal_moves'] * (1 + 1e-9)
+
+    @staticmethod
+    def test_own_time_leaves_out_instrumented_callees():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        with chessington.engine.profile() as stats:
+            board.legal_moves()
+
+        # Assert
+        assert 0 < stats.own_times['Board.legal_moves'] < stats.times['Board.legal_moves']
+        assert sum(stats.own_times.values()) == pytest.approx(stats.times['Board.legal_moves'])
@@ -0,0 +1,140 @@
+import json
+
+from chessington.engine.binary import encode_position, write_games
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+from chessington.engine.moves import encode_move
+from chessington.engine.referee import read_archive, referee_game, referee_games, main
+
+ARCHIVE = '''[Event "Scholar's mate"]
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+
+[Event "Illegal"]
+1. e4 e5 2. Ke3 *
+
+[Event "Bad set up"]
+[FEN "not a position"]
+1. e4 *
+'''
+
+
+class TestRefereeGame:
+
+    @staticmethod
+    def test_legal_game_is_counted():
+        # Arrange
+        game = (1, {}, None, ['e4', 'e5', 'Bc4', 'Nc6', 'Qh5', 'Nf6', 'Qxf7#'], None)
+
+        # Act
+        report = referee_game(game)
+
+        # Assert
+        assert report['status'] == 'ok'
+        assert (report['plies'], report['captures'], report['checks']) == (7, 1, 1)
+        assert report['final_fen'] == 'r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4'
+
+    @staticmethod
+    def test_illegal_move_is_reported():
+        # Arrange
+        game = (2, {}, None, ['e4', 'e5', 'Ke3', 'Nc6'], None)
+
+        # Act
+        report = referee_game(game)
+
+        # Assert
+        assert report['status'] == 'illegal'
+        assert report['plies'] == 2
+        assert report['illegal_move']['ply'] == 3
+        assert report['illegal_move']['move'] == 'Ke3'
+        assert report['illegal_move']['fen'] == 'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2'
+
+    @staticmethod
+    def test_unreadable_game_is_malformed():
+        # Act
+        report = referee_game((3, {'FEN': 'not a position'}, None, ['e4'], None))
+
+        # Assert
+        assert report['status'] == 'malformed'
+
+
+class TestRefereeGames:
+
+    @staticmethod
+    def test_pool_reports_in_archive_order():
+        # Arrange
+        games = [(number, {}, None, ['e4', 'e5'] if number % 3 else ['e4', 'e4'], None) for number in range(1, 21)]
+
+        # Act
+        reports = list(referee_games(games, workers=2, batch_size=3, max_in_flight=2))
+
+        # Assert
+        assert [report['game'] for report in reports] == list(range(1, 21))
+        assert [report['status'] for report in reports] == ['ok' if number % 3 else 'illegal' for number in range(1, 21)]
+
+    @staticmethod
+    def test_pool_matches_single_process():
+        # Arrange
+        games = [(number, {}, None, ['d4', 'd5', 'c4', 'dxc4', 'e3'][:number], None) for number in range(6)]
+
+        # Act / Assert
+        assert list(referee_games(games, workers=2, batch_size=1)) == list(referee_games(games))
+
+
+class TestMain:
+
+    @staticmethod
+    def test_pgn_archive_reports(tmp_path):
+        # Arrange
+        archive = tmp_path / 'games.pgn'
+        archive.write_text(ARCHIVE)
+        output = tmp_path / 'reports.jsonl'
+
+        # Act
+        main([str(archive), '--output', str(output)])
+
+        # Assert
+        reports = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [report['status'] for report in reports] == ['ok', 'illegal', 'malformed']
+        assert reports[0]['headers'] == {'Event': "Scholar's mate", 'Result': '1-0'}
+
+    @staticmethod
+    def test_binary_archive_reports(tmp_path):
+        # Arrange
+        archive = tmp_path / 'games.bin'
+        push = encode_move(Square.at(1, 4), Square.at(3, 4))
+        write_games(archive, [(Board.at_starting_position(), [push]), (Board.at_starting_position(), [push, push])])
+
+        # Act
+        reports = [referee_game(game) for game in read_archive(archive)]
+
+        # Assert
+        assert [report['status'] for report in reports] == ['ok', 'illegal']
+        assert reports[1]['illegal_move']['move'] == 'e2e4'
+
+    @staticmethod
+    def test_corrupt_binary_records_are_malformed(tmp_path):
+        # Arrange
+        archive = tmp_path / 'games.bin'
+        push = encode_move(Square.at(1, 4), Square.at(3, 4))
+        write_games(archive, [(Board.at_starting_position(), [push]), (Board.at_starting_position(), [push])])
+        data = bytearray(archive.read_bytes())
+        data[8] = 0x77  # not a piece
+        archive.write_bytes(bytes(data[:-1]))  # and the second game is cut short
+
+        # Act
+        reports = list(referee_games(read_archive(archive)))
+
+        # Assert
+        assert [report['status'] for report in reports] == ['malformed', 'malformed']
+        assert 'ends part way through a game' in reports[1]['error']
+
+    @staticmethod
+    def test_position_without_kings_is_malformed():
+        # Arrange
+        record = encode_position(Board.from_fen('8/8/8/8/8/8/4P3/8 w - - 0 1'))
+
+        # Act
+        report = referee_game((1, {}, record, [encode_move(Square.at(1, 4), Square.at(2, 4))], None))
+
+        # Assert
+        assert report['status'] == 'malformed'
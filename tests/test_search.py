@@ -0,0 +1,154 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.moves import decode_move, move_to_text
+from chessington.engine.search import Searcher, SearchResult, search, material, MATE_SCORE
+
+
+def minimax(board, depth, ply=0):
+    # Negamax without pruning, to check that alpha-beta finds the same scores
+    if depth == 0:
+        return material(board)
+    moves = board.legal_moves()
+    if not moves:
+        return search(board, depth=1).score + ply
+    best = None
+    for move in moves:
+        board.make_move(*decode_move(move))
+        score = -minimax(board, depth - 1, ply + 1)
+        board.unmake_move()
+        best = score if best is None else max(best, score)
+    return best
+
+
+class TestMaterial:
+
+    @staticmethod
+    def test_material_is_from_side_to_move():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 b - - 0 1')
+
+        # Act
+        score = material(board)
+
+        # Assert
+        assert score == -500
+
+
+class TestSearch:
+
+    @staticmethod
+    def test_finds_mate_in_one():
+        # Arrange
+        board = Board.from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+
+        # Act
+        result = search(board, depth=3)
+
+        # Assert
+        assert move_to_text(result.move) == 'a1a8'
+        assert result.score == MATE_SCORE - 1
+        assert result.pv == (result.move,)
+
+    @staticmethod
+    def test_captures_hanging_queen():
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1')
+
+        # Act
+        result = search(board, depth=2)
+
+        # Assert
+        assert move_to_text(result.move) == 'd2d5'
+        assert result.score == 500
+
+    @staticmethod
+    def test_stalemate_scores_zero():
+        # Arrange
+        board = Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')
+
+        # Act
+        result = search(board, depth=2)
+
+        # Assert
+        assert result == SearchResult(None, 0, 1, result.nodes, result.elapsed, ())
+
+    @staticmethod
+    @pytest.mark.parametrize('fen', [
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        'r3k2r/ppp2ppp/2n1bn2/3pp3/1b1PP3/2N1BN2/PPP2PPP/R2QKB1R w KQkq - 0 7',
+    ])
+    def test_alpha_beta_matches_minimax(fen):
+        # Arrange
+        board = Board.from_fen(fen)
+
+        # Act
+        result = search(board, depth=3)
+
+        # Assert
+        assert result.score == minimax(board, 3)
+
+    @staticmethod
+    def test_search_leaves_board_unchanged():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        search(board, depth=3)
+
+        # Assert
+        assert board == Board.at_starting_position()
+        assert board.undo_stack == []
+
+    @staticmethod
+    def test_reports_each_iteration():
+        # Arrange
+        board = Board.at_starting_position()
+        iterations = []
+
+        # Act
+        result = Searcher().search(board, depth=3, on_iteration=iterations.append)
+
+        # Assert
+        assert [iteration.depth for iteration in iterations] == [1, 2, 3]
+        assert result.depth == 3
+        assert len(result.pv) == 3
+        assert result.nodes >= iterations[-1].nodes
+        assert result.nps >= 0
+
+    @staticmethod
+    def test_node_budget_stops_deepening():
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        result = search(board, nodes=500)
+
+        # Assert
+        assert 1 <= result.depth < 64
+        assert result.nodes <= 501
+        assert result.move in board.legal_moves()
+        assert board == Board.at_starting_position()
+
+    @staticmethod
+    def test_uses_given_evaluation():
+        # Arrange
+        board = Board.at_starting_position()
+        calls = []
+
+        def evaluate(position):
+            calls.append(position)
+            return 0
+
+        # Act
+        result = Searcher(evaluate).search(board, depth=1)
+
+        # Assert
+        assert len(calls) == 20
+        assert result.score == 0
+
+    @staticmethod
+    def test_needs_a_budget():
+        # Act / Assert
+        with pytest.raises(ValueError):
+            search(Board.at_starting_position())